@@ -1,5 +1,10 @@
 import random
 import collections
+import functools
+import proverb_binary
+from proverb_corpus import ProverbCorpus
+from proverb_record import ProverbRecord, build_word_indicies, make_record
+from proverb_sampler import DedupedCorpus, ShuffledSampler
  
 def load_proverbs(file_name):
     try:
@@ -16,12 +21,38 @@ def load_proverbs(file_name):
         print("Proverbs file not found.")
         return None  
  
-def get_proverb(proverbs):
+# Indexed, memory-mapped alternative to load_proverbs for large files.
+# Uses the compiled corpus from proverb_binary when it is up to date (it
+# holds each distinct proverb once); a text corpus skips repeated lines
+# through DedupedCorpus, which reads them from the text's index.
+def load_corpus(file_name):
+    try:
+        if proverb_binary.is_current(file_name):
+            corpus = proverb_binary.BinaryCorpus(proverb_binary.binary_path(file_name))
+        else:
+            corpus = DedupedCorpus(ProverbCorpus(file_name))
+    except FileNotFoundError:
+        print("Proverbs file not found.")
+        return None
+    except OSError as error:
+        # e.g. no permission to write the index next to the text
+        print(f"Could not open the proverbs file: {error}")
+        return None
+    if len(corpus) == 0:
+        print('Proverbs file is empty.')
+        return None
+    return corpus
+ 
+def get_proverb(proverbs, sampler=None):
+    if sampler is not None:
+        return proverbs[sampler.sample()]
     proverb = random.choice(proverbs)
     return proverb
     
  
 def get_current_masked(proverb, masked):
+    if isinstance(masked, MaskState):
+        return masked.render()
     ret = ""
     for c, is_masked in zip(proverb, masked):
         ret += '~' if is_masked else c
@@ -37,12 +68,18 @@ def get_raw_lower_words(proverbs, masked):
     return [word for word in ret.split("|") if len(word.strip()) > 0]
  
 def reveal_words(guess, masked, indicies):
+    if isinstance(masked, MaskState):
+        masked.reveal_words(guess)
+        return
     for index in indicies[guess]:
         for i in range(index, index + len(guess)):
             masked[i] = False
  
 # Reveal least frequent, unrevealed character
 def reveal_char(proverb, masked):
+    if isinstance(masked, MaskState):
+        masked.reveal_char()
+        return
     unreveal_chars = [c.lower() for i, c in enumerate(proverb) if masked[i]]
     char_counter = dict(collections.Counter(unreveal_chars))
  
@@ -88,23 +125,92 @@ def guess_input(proverb, masked, indicies, guesses_left, user_input, misses):
         reveal_char(proverb, masked)
     return wrong_guesses
  
-def build_word_indicies(proverb):
-    lower_proverb = proverb.lower()
-    indicies = collections.defaultdict(list)
- 
-    current_word = ""
-    start_index = None
-    for i, c in enumerate(lower_proverb + " "):
-        if c.isalpha() or c == "'":
-            if start_index is None:
-                start_index = i
-            current_word += c.lower()
+@functools.lru_cache(maxsize=4096)
+def compile_proverb(proverb):
+    return make_record(proverb, build_word_indicies(proverb))
+ 
+class MaskState:
+    """Mask for one round, kept as a bytearray (1 = masked) next to the
+    rendered view, with a count of unrevealed positions per letter and the
+    letters bucketed by that count. Revealing a word or a letter touches
+    only the positions it uncovers, and render() is a single join."""
+ 
+    def __init__(self, record):
+        self.record = record
+        self.proverb = record.proverb
+        self.mask = bytearray(record.mask)
+        self.view = list(record.masked_view)
+        self.counts = {c: len(positions) for c, positions in record.letters.items()}
+        self.first = dict.fromkeys(record.letters, 0)
+        self.buckets = collections.defaultdict(set)
+        for c, count in self.counts.items():
+            self.buckets[count].add(c)
+        self.remaining = sum(self.counts.values())
+ 
+    def __len__(self):
+        return len(self.mask)
+ 
+    def __getitem__(self, i):
+        return bool(self.mask[i])
+ 
+    def _reveal(self, i):
+        if not self.mask[i]:
+            return
+        self.mask[i] = 0
+        self.view[i] = self.proverb[i]
+        self.remaining -= 1
+        c = self.proverb[i].lower()
+        count = self.counts[c]
+        bucket = self.buckets[count]
+        bucket.discard(c)
+        if not bucket:
+            del self.buckets[count]
+        if count > 1:
+            self.counts[c] = count - 1
+            self.buckets[count - 1].add(c)
         else:
-            indicies[current_word].append(start_index)
-            start_index = None
-            current_word = ""
+            del self.counts[c]
  
-    return dict(indicies)
+    def reveal_words(self, guess):
+        if not guess:
+            return
+        for index in self.record.indicies.get(guess, ()):
+            for i in range(index, index + len(guess)):
+                self._reveal(i)
+ 
+    def _first_masked(self, c):
+        positions = self.record.letters[c]
+        k = self.first[c]
+        while not self.mask[positions[k]]:
+            k += 1
+        self.first[c] = k
+        return positions[k]
+ 
+    def reveal_char(self):
+        # Least frequent unrevealed letter; ties go to the one whose first
+        # unrevealed position comes earliest, as in reveal_char()
+        if not self.buckets:
+            return None
+        candidates = self.buckets[min(self.buckets)]
+        c = min(candidates, key=self._first_masked)
+        positions = self.record.letters[c]
+        for i in positions[self.first[c]:]:
+            self._reveal(i)
+        return c
+ 
+    def reveal_all(self):
+        self.mask[:] = bytes(len(self.mask))
+        self.view = list(self.proverb)
+        self.counts.clear()
+        self.buckets.clear()
+        self.remaining = 0
+ 
+    def render(self):
+        return "".join(self.view)
+ 
+def compile_corpus(proverbs):
+    # Bulk version for small corpora; large ones rely on the LRU cache
+    return [compile_proverb(proverb) for proverb in proverbs]
  
 def printStats(rounds_played, rounds_won, total_reveal, total_words):
     win_percentage = (rounds_won / rounds_played) * 100
@@ -115,41 +221,130 @@ def printStats(rounds_played, rounds_won, total_reveal, total_words):
     print(f"Total reveals: {total_reveal}")
     print(f"Average letter reveal: {average_letter_reveal}%")
  
-def main():
-    proverbs = load_proverbs('proverbs.txt')
-    misses = []
-    rounds_played = 0
-    rounds_won = 0
-    total_reveal = 0
-    total_words = 0
-    while True:
-        rounds_played += 1
-        proverb = get_proverb(proverbs)
- 
-        masked = [c.isalpha() for c in proverb]
-        raw_words = get_raw_lower_words(proverb, masked)
-        indicies = build_word_indicies(proverb)
+GuessResult = collections.namedtuple(
+    "GuessResult", ["hits", "misses", "wrong", "no_guess", "round_over", "won"])
  
-        wrong_guess = 0
-        max_guess = len(raw_words)
-        total_words += len(raw_words)
+class ProverbSession:
+    """One player's game with no I/O: the same rules and counters as
+    guess_input and printStats, driven by guess() calls. The proverb
+    source can be any sequence, e.g. a shared ProverbCorpus; a sampler
+    from proverb_sampler, if given, picks each round's proverb."""
  
-        while wrong_guess < max_guess and any(masked):
-            print(get_current_masked(proverb, masked))
-            print("letter reveals : %d / %d" % (wrong_guess, max_guess))
-            user_input = input(">> Guess: ")
-            wrong_guess += guess_input(proverb, masked, indicies, max_guess - wrong_guess + 1, user_input, misses)
+    def __init__(self, proverbs, rng=None, sampler=None):
+        self.proverbs = proverbs
+        self.rng = rng or random.Random()
+        self.sampler = sampler
+        self.misses = []
+        self.rounds_played = 0
+        self.rounds_won = 0
+        self.total_reveal = 0
+        self.total_words = 0
+        self.record = None
+        self.masked = None
+        self.wrong_guess = 0
+        self.max_guess = 0
+        self.finished = True
  
-        if wrong_guess >= max_guess:
-            print("Sorry, you have lost this round.")
+    def new_round(self, proverb=None):
+        if proverb is not None:
+            self.record = compile_proverb(proverb)
         else:
+            if self.sampler is not None:
+                i = self.sampler.sample()
+            else:
+                i = self.rng.randrange(len(self.proverbs))
+            # A compiled BinaryCorpus has the words already split
+            stored_record = getattr(self.proverbs, "record", None)
+            self.record = stored_record(i) if stored_record else compile_proverb(self.proverbs[i])
+        self.masked = MaskState(self.record)
+        self.wrong_guess = 0
+        self.max_guess = self.record.word_count
+        self.rounds_played += 1
+        self.total_words += self.max_guess
+        self.finished = False
+        if self.round_over():
+            self._finish()
+        return self.record.proverb
+ 
+    def round_over(self):
+        return self.wrong_guess >= self.max_guess or not self.masked.remaining
+ 
+    def won(self):
+        return self.finished and self.wrong_guess < self.max_guess
+ 
+    def view(self):
+        return self.masked.render()
+ 
+    def guess(self, user_input):
+        if self.finished:
+            raise ValueError("Start a new round first.")
+        indicies = self.record.indicies
+        guesses_left = self.max_guess - self.wrong_guess + 1
+        hits = []
+        misses = []
+        wrong = 0
+        for guess in user_input.lower().split():
+            if guess in indicies:
+                hits.append(guess)
+                self.masked.reveal_words(guess)
+            else:
+                misses.append(guess)
+                wrong += 1
+                guesses_left -= 1
+                self.masked.reveal_char()
+                if guesses_left < 0:
+                    break
+        no_guess = len(user_input) == 0
+        if no_guess:
+            wrong += 1
+            self.masked.reveal_char()
+        self.misses.extend(misses)
+        self.wrong_guess += wrong
+        if self.round_over():
+            self._finish()
+        return GuessResult(hits, misses, wrong, no_guess, self.finished, self.won())
+ 
+    def _finish(self):
+        self.finished = True
+        if self.wrong_guess < self.max_guess:
+            self.rounds_won += 1
+        self.total_reveal += self.wrong_guess
+ 
+    def stats(self):
+        return {
+            "rounds_played": self.rounds_played,
+            "rounds_won": self.rounds_won,
+            "total_reveal": self.total_reveal,
+            "total_words": self.total_words,
+        }
+ 
+def main():
+    proverbs = load_corpus('proverbs.txt')
+    if proverbs is None:
+        return
+    # No proverb comes up twice until all of them have
+    session = ProverbSession(proverbs, sampler=ShuffledSampler(len(proverbs)))
+    while True:
+        session.new_round()
+ 
+        while not session.finished:
+            print(session.view())
+            print("letter reveals : %d / %d" % (session.wrong_guess, session.max_guess))
+            result = session.guess(input(">> Guess: "))
+            for guess in result.hits:
+                print("Good guess!", '"' + guess + '"', "is in the proverb.")
+            if result.misses:
+                print(f"Misses: {', '.join(session.misses)}")
+            if result.no_guess:
+                print("No guess:")
+ 
+        if session.won():
             print("Congratulations, you won this round!")
-            rounds_won += 1
+        else:
+            print("Sorry, you have lost this round.")
  
-        total_reveal += wrong_guess
-        masked = [False] * len(proverb)
-        print("The proverb is:", get_current_masked(proverb, masked))
-        printStats(rounds_played, rounds_won, total_reveal, total_words)
+        print("The proverb is:", session.record.proverb)
+        printStats(session.rounds_played, session.rounds_won, session.total_reveal, session.total_words)
         play_again = input("Play again? (Y/N) ")
         if play_again.lower() != 'y' and play_again.lower() != 'n':
             print("Invalid Input.Try again")
@@ -0,0 +1,111 @@
+import sys
+import time
+import numpy as np
+from poker_eval import (FLUSH_TABLE, STRAIGHT_HIGH, CATEGORY_SHIFT, HIGH_CARD,
+                        ONE_PAIR, TWO_PAIR, THREE_KIND, STRAIGHT, FOUR_KIND,
+                        FULL_HOUSE, evaluate)
+
+# Vectorized version of poker_eval.evaluate for large batches of hands.
+# Takes an (N, 5..7) array of int cards and gives back the same strengths
+# the scalar evaluator does, so results can be mixed freely.
+
+BLOCK_ROWS = 65536
+
+_FLUSH = np.array(FLUSH_TABLE, dtype=np.int64)
+_STRAIGHT = np.array(STRAIGHT_HIGH, dtype=np.int64)
+_TOP_BIT = np.array([mask.bit_length() - 1 for mask in range(8192)], dtype=np.int64)
+_RANKS = np.arange(13)
+_RANK_BITS = 1 << _RANKS.astype(np.int64)
+
+
+def _pack(category, *ranks):
+    strength = np.int64(category) << CATEGORY_SHIFT
+    for i, rank in enumerate(ranks):
+        strength = strength | (rank << (16 - 4 * i))
+    return strength
+
+
+def _evaluate_block(cards):
+    n = len(cards)
+    ranks = cards >> 2
+    suits = cards & 3
+    rows = np.arange(n)[:, None]
+
+    # Rank histogram, distinct-rank mask and the rank mask of the longest suit
+    counts = np.bincount((rows * 13 + ranks).ravel(), minlength=n * 13).reshape(n, 13)
+    rank_mask = (counts > 0).astype(np.int64) @ _RANK_BITS
+    suit_counts = np.bincount((rows * 4 + suits).ravel(), minlength=n * 4).reshape(n, 4)
+    flush_suit = suit_counts.argmax(axis=1)
+    is_flush = suit_counts.max(axis=1) >= 5
+    flush_mask = np.where(suits == flush_suit[:, None], 1 << ranks, 0).sum(axis=1)
+
+    # Ranks ordered by (count, rank), highest first: slot 0 is the
+    # quad/trip/top pair rank and the rest follow as poker_eval orders them
+    order = np.sort(np.where(counts > 0, counts * 16 + _RANKS, 0), axis=1)[:, :-6:-1]
+    o0, o1, o2, o3, o4 = (order[:, i] & 15 for i in range(5))
+    c1, c2 = order[:, 0] >> 4, order[:, 1] >> 4
+    straight_high = _STRAIGHT[rank_mask]
+
+    conditions = [
+        is_flush,
+        c1 == 4,
+        (c1 == 3) & (c2 >= 2),
+        straight_high >= 0,
+        c1 == 3,
+        (c1 == 2) & (c2 == 2),
+        c1 == 2,
+    ]
+    choices = [
+        _FLUSH[flush_mask],
+        _pack(FOUR_KIND, o0, _TOP_BIT[rank_mask & ~(1 << o0)]),
+        _pack(FULL_HOUSE, o0, o1),
+        _pack(STRAIGHT, straight_high),
+        _pack(THREE_KIND, o0, o1, o2),
+        _pack(TWO_PAIR, o0, o1, _TOP_BIT[rank_mask & ~(1 << o0) & ~(1 << o1)]),
+        _pack(ONE_PAIR, o0, o1, o2, o3),
+    ]
+    return np.select(conditions, choices, _pack(HIGH_CARD, o0, o1, o2, o3, o4))
+
+
+def evaluate_batch(cards):
+    """Returns (strengths, categories), both shaped (N,), for an (N, 5..7)
+    int card array."""
+    cards = np.asarray(cards, dtype=np.int64)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+        raise ValueError("Expected an (N, 5..7) array of cards.")
+    if cards.size and (cards.min() < 0 or cards.max() > 51):
+        raise ValueError("Cards are ints from 0 to 51.")
+    strengths = np.empty(len(cards), dtype=np.int64)
+    for start in range(0, len(cards), BLOCK_ROWS):
+        block = cards[start:start + BLOCK_ROWS]
+        strengths[start:start + len(block)] = _evaluate_block(block)
+    return strengths, strengths >> CATEGORY_SHIFT
+
+
+def random_hands(n, cards_per_hand=7, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, 52)).argsort(axis=1)[:, :cards_per_hand]
+
+
+def benchmark(n=200000, seed=0):
+    hands = random_hands(n, seed=seed)
+    as_lists = hands.tolist()
+
+    start = time.perf_counter()
+    scalar = [evaluate(hand) for hand in as_lists]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    strengths, _ = evaluate_batch(hands)
+    batch_time = time.perf_counter() - start
+
+    if strengths.tolist() != scalar:
+        raise AssertionError("Batch and scalar evaluators disagree.")
+    print(f"Hands:   {n}")
+    print(f"Scalar:  {n / scalar_time:,.0f} hands/s")
+    print(f"Batch:   {n / batch_time:,.0f} hands/s")
+    print(f"Speedup: {scalar_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
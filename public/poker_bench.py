@@ -0,0 +1,302 @@
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from math import comb
+from itertools import combinations
+from poker_eval import (HAND_RANKINGS, STRAIGHT_FLUSH, RANK_KEY, RANK_BIT,
+                        RANK_TABLE, FLUSH_TABLE, category,
+                        category_name, evaluate, hand_value)
+from poker_engine import FastDeck, PokerEngine
+
+# Benchmarks for the evaluation and game hot paths. Every workload is built
+# from a fixed seed and covers all nine hand categories, so numbers are
+# comparable between versions; results can be saved as a JSON baseline and
+# later runs compared against it.
+
+DEFAULT_BASELINE = "poker_bench_baseline.json"
+
+# Known category frequencies over all C(52, 5) = 2,598,960 five-card hands
+REFERENCE_5CARD = {
+    "Straight Flush": 40,
+    "Four of a Kind": 624,
+    "Full House": 3744,
+    "Flush": 5108,
+    "Straight": 10200,
+    "Three of a Kind": 54912,
+    "Two Pair": 123552,
+    "One Pair": 1098240,
+    "High Card": 1302540,
+}
+
+# Known category frequencies over all C(52, 7) = 133,784,560 seven-card hands
+REFERENCE_7CARD = {
+    "Straight Flush": 41584,
+    "Four of a Kind": 224848,
+    "Full House": 3473184,
+    "Flush": 4047644,
+    "Straight": 6180020,
+    "Three of a Kind": 6461620,
+    "Two Pair": 31433400,
+    "One Pair": 58627800,
+    "High Card": 23294460,
+}
+
+# Rank multiplicities of a hand's core, weakest category first; the flush
+# and straight cores are built separately
+_CORES = {0: [1, 1, 1, 1, 1], 1: [2, 1, 1, 1], 2: [2, 2, 1], 3: [3, 1, 1],
+          6: [3, 2], 7: [4, 1]}
+
+
+def _core(cat, rng):
+    if cat in _CORES:
+        ranks = rng.sample(range(13), len(_CORES[cat]))
+        cards = []
+        for rank, count in zip(ranks, _CORES[cat]):
+            cards += [rank * 4 + suit for suit in rng.sample(range(4), count)]
+        return cards
+    if cat == 5:
+        suit = rng.randrange(4)
+        return [rank * 4 + suit for rank in rng.sample(range(13), 5)]
+    high = rng.randrange(3, 13)
+    ranks = [(high - i) % 13 if high > 3 else [3, 2, 1, 0, 12][i] for i in range(5)]
+    if cat == STRAIGHT_FLUSH:
+        suit = rng.randrange(4)
+        return [rank * 4 + suit for rank in ranks]
+    return [rank * 4 + rng.randrange(4) for rank in ranks]
+
+
+def category_hands(cat, count, rng, cards_per_hand=7):
+    """Seeded hands whose best category is exactly cat."""
+    hands = []
+    while len(hands) < count:
+        hand = _core(cat, rng)
+        unseen = [c for c in range(52) if c not in hand]
+        hand += rng.sample(unseen, cards_per_hand - len(hand))
+        if len(set(hand)) == len(hand) and category(evaluate(hand)) == cat:
+            hands.append(hand)
+    return hands
+
+
+def workload(per_category=2000, random_hands=20000, seed=0):
+    rng = random.Random(seed)
+    hands = []
+    for cat in range(STRAIGHT_FLUSH + 1):
+        hands += category_hands(cat, per_category, rng)
+    hands += [rng.sample(range(52), 7) for _ in range(random_hands)]
+    rng.shuffle(hands)
+    return hands
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def _calibration(n=200000):
+    # Fixed interpreter workload timed right before every pass: when the
+    # whole machine runs slower for a while (frequency scaling, a busy
+    # neighbour) both slow down, and the ratio between them doesn't
+    table = list(range(256))
+    total = 0
+    for i in range(n):
+        total += table[i & 255] * (i >> 3)
+    return total
+
+
+def measure(name, call, items, repeat=15, latency_items=5000):
+    """Throughput is the median of repeat passes of call(item) over every
+    item, each pass timed as a whole so no per-call clock reads land in
+    it. Each pass is also divided by a calibration run timed just before
+    it; "relative" is the median of that, in items per calibration run,
+    and is what baselines are compared on. Latency percentiles come from
+    a separate pass over the first latency_items items with one clock
+    pair per call, and peak memory from one more pass under tracemalloc."""
+    clock = time.perf_counter_ns
+    call(items[0])  # warm-up, e.g. lazy table fills
+    passes = []
+    ratios = []
+    # As timeit does: a collection landing in one pass but not another is
+    # noise, not a cost of the code under test
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = clock()
+            _calibration()
+            calibration = clock() - start
+            start = clock()
+            for item in items:
+                call(item)
+            elapsed = clock() - start
+            passes.append(elapsed / 1e9)
+            ratios.append(elapsed / calibration)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    passes.sort()
+    ratios.sort()
+
+    latencies = []
+    for item in items[:latency_items]:
+        t0 = clock()
+        call(item)
+        latencies.append(clock() - t0)
+
+    tracemalloc.start()
+    for item in items:
+        call(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "name": name,
+        "calls": len(items),
+        "per_second": len(items) / passes[len(passes) // 2],
+        "relative": len(items) / ratios[len(ratios) // 2],
+        # fastest over slowest pass; near 1 on a quiet machine
+        "spread": passes[0] / passes[-1],
+        "p50_ns": _percentile(latencies, 0.50),
+        "p99_ns": _percentile(latencies, 0.99),
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_benchmarks(seed=0, games=20000):
+    # Build the whole rank table first so lazy fills don't land in timings
+    RANK_TABLE.fill()
+    hands = workload(seed=seed)
+    results = [
+        measure("evaluate", evaluate, hands),
+        measure("check_hand", lambda hand: hand_value(hand).name, hands),
+    ]
+    try:
+        from pokergame3 import Card, PokerHand
+    except ImportError:
+        pass  # graphics.py not available, skip the Card-object path
+    else:
+        def check_hand(hand):
+            poker_hand = PokerHand()
+            poker_hand.cards = [Card.from_code(c) for c in hand[:2]]
+            return poker_hand.check_hand([Card.from_code(c) for c in hand[2:]])
+        results.append(measure("PokerHand.check_hand", check_hand, hands))
+
+    deck = FastDeck(random.Random(seed))
+
+    def deal(_):
+        deck.reset()
+        return deck.deal_many(9)
+    results.append(measure("deck.deal", deal, range(games)))
+
+    engine = PokerEngine(seed=seed)
+    results.append(measure("game", lambda _: engine.play(), range(games)))
+    return results
+
+
+def count_categories():
+    """Category counts over every seven-card hand. Hands are grouped by
+    rank histogram (weighted by the suit choices it allows), then flush
+    hands are moved from their histogram category to their flush one."""
+    counts = [0] * (STRAIGHT_FLUSH + 1)
+
+    def histograms(rank, left, key, ways):
+        if rank == 13:
+            if left == 0:
+                counts[category(RANK_TABLE[key])] += ways
+            return
+        for n in range(min(4, left) + 1):
+            histograms(rank + 1, left - n, key + n * RANK_KEY[rank * 4], ways * comb(4, n))
+    histograms(0, 7, 0, 1)
+
+    # Flush hands in one suit (hearts), times four for the suits
+    flush_suit = [r * 4 for r in range(13)]
+    others = [c for c in range(52) if c & 3]
+    for size in (5, 6, 7):
+        for suited in combinations(flush_suit, size):
+            key = sum(RANK_KEY[c] for c in suited)
+            mask = sum(RANK_BIT[c] for c in suited)
+            flush_cat = category(FLUSH_TABLE[mask])
+            for rest in combinations(others, 7 - size):
+                rank_cat = category(RANK_TABLE[key + sum(RANK_KEY[c] for c in rest)])
+                counts[rank_cat] -= 4
+                counts[flush_cat] += 4
+    return {category_name(cat << 20): count for cat, count in enumerate(counts)}
+
+
+def count_five_card_categories():
+    """Category counts from evaluate() itself over every five-card hand,
+    so the code path the game uses is checked, not just its tables."""
+    counts = [0] * (STRAIGHT_FLUSH + 1)
+    for hand in combinations(range(52), 5):
+        counts[category(evaluate(hand))] += 1
+    return {category_name(cat << 20): count for cat, count in enumerate(counts)}
+
+
+def check_reference():
+    ok = True
+    for cards, counts, reference in ((5, count_five_card_categories(), REFERENCE_5CARD),
+                                     (7, count_categories(), REFERENCE_7CARD)):
+        print(f"{cards}-card hands")
+        for name in HAND_RANKINGS:
+            marker = "ok" if counts[name] == reference[name] else "MISMATCH"
+            ok = ok and marker == "ok"
+            print(f"{name:16} {counts[name]:>12,} {reference[name]:>12,}  {marker}")
+        print(f"{'Total':16} {sum(counts.values()):>12,} {comb(52, cards):>12,}")
+    return ok
+
+
+def report(results, baseline=None, tolerance=0.15):
+    """Prints the results; with a baseline, returns the names whose
+    calibrated throughput got more than tolerance slower."""
+    regressions = []
+    old = {r["name"]: r for r in baseline["results"]} if baseline else {}
+    for r in results:
+        line = (f"{r['name']:22} {r['per_second']:>12,.0f}/s  p50 {r['p50_ns']:>7,} ns"
+                f"  p99 {r['p99_ns']:>8,} ns  peak {r['peak_kib']:>8,.1f} KiB"
+                f"  spread {r.get('spread', 1.0):4.2f}")
+        if r["name"] in old:
+            key = "relative" if "relative" in old[r["name"]] else "per_second"
+            ratio = r[key] / old[r["name"]][key]
+            line += f"  {ratio:5.2f}x baseline"
+            if ratio < 1 - tolerance:
+                regressions.append(r["name"])
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poker hot path benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--games", type=int, default=20000)
+    parser.add_argument("--save", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", nargs="?", const=DEFAULT_BASELINE,
+                        help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--reference", action="store_true",
+                        help="check category counts over all 5- and 7-card hands")
+    args = parser.parse_args(argv)
+
+    if args.reference and not check_reference():
+        return 1
+    results = run_benchmarks(args.seed, args.games)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    regressions = report(results, baseline, args.tolerance)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": sys.version.split()[0], "seed": args.seed,
+                       "results": results}, file, indent=2)
+    if regressions:
+        print("Slower than baseline:", ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
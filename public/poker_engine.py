@@ -0,0 +1,182 @@
+import random
+from collections import namedtuple
+from poker_eval import evaluate
+
+# Headless version of the PokerGame rules: no window, no printing. Cards are
+# the ints used by poker_eval, and a strategy is any callable
+#   strategy(player_hole, table_cards, betting_round) -> "STAY" or "FOLD"
+# that sees only the table cards revealed so far in that round.
+
+# Table cards face up when the player acts in each betting round
+REVEALED_CARDS = {1: 0, 2: 3, 3: 4, 4: 5}
+
+# seed is the per-game deck seed when the deal was seeded (see
+# PokerEngine.new_game), else 0
+GameResult = namedtuple("GameResult", [
+    "player_hole", "dealer_hole", "table_cards",
+    "action", "folded_round", "player_value", "dealer_value", "score",
+    "seed"], defaults=(0,))
+
+
+def fold_points(folded_round):
+    return 100 - (folded_round - 1) * 25
+
+
+def score_game(player_value, dealer_value, folded_round=0):
+    """Points for one deal: +-100 at showdown. Folding in round k flips the
+    sign and scales it to fold_points(k); a draw is 0 either way."""
+    if player_value > dealer_value:
+        game_points = 100
+    elif player_value < dealer_value:
+        game_points = -100
+    else:
+        return 0
+    if folded_round:
+        return -fold_points(folded_round) if game_points > 0 else fold_points(folded_round)
+    return game_points
+
+
+def always_stay(player_hole, table_cards, betting_round):
+    return "STAY"
+
+
+class FastDeck:
+    """One preallocated list of int cards. Each deal() is a single step of a
+    Fisher-Yates shuffle, so only the cards actually dealt get shuffled, and
+    reset() just rewinds. Dead cards (e.g. known hole cards in an equity
+    query) sit past the live part of the list and are never dealt. rng is
+    anything with a random() method, such as a seeded random.Random."""
+
+    def __init__(self, rng=None, dead=()):
+        self.random = (rng or random.Random()).random
+        self.cards = list(range(52))
+        self.live = 52
+        self.dealt = 0
+        if dead:
+            self.set_dead(dead)
+
+    def set_dead(self, dead):
+        dead = set(dead)
+        self.cards = [c for c in range(52) if c not in dead] + sorted(dead)
+        self.live = 52 - len(dead)
+        self.dealt = 0
+
+    def reset(self):
+        # Any order of the live cards is a fine start for Fisher-Yates
+        self.dealt = 0
+
+    def reseed(self, seed):
+        """Puts the live cards back in order under a fresh RNG, so the
+        deals that follow depend on seed alone."""
+        self.random = random.Random(seed).random
+        self.cards[:self.live] = sorted(self.cards[:self.live])
+        self.dealt = 0
+
+    def deal(self):
+        i = self.dealt
+        left = self.live - i
+        if left <= 0:
+            raise ValueError("No more cards in the deck.")
+        cards = self.cards
+        j = i + int(self.random() * left)
+        cards[i], cards[j] = cards[j], cards[i]
+        self.dealt = i + 1
+        return cards[i]
+
+    def deal_many(self, n):
+        return [self.deal() for _ in range(n)]
+
+    def __len__(self):
+        return self.live - self.dealt
+
+
+class GameState:
+    """One deal played a step at a time: act() takes the player's STAY or
+    FOLD for the current betting round and, once the deal is over, returns
+    its GameResult (None before that). PokerEngine.play loops over it with
+    a strategy; pokergame3 drives it from its buttons."""
+    __slots__ = ("player_hole", "dealer_hole", "table_cards", "evaluate",
+                 "seed", "betting_round", "action", "folded_round", "result")
+
+    def __init__(self, player_hole, dealer_hole, table_cards, evaluator=evaluate, seed=0):
+        self.player_hole = player_hole
+        self.dealer_hole = dealer_hole
+        self.table_cards = table_cards
+        self.evaluate = evaluator
+        self.seed = seed
+        self.betting_round = 1  # 0 once the deal is over
+        self.action = ""
+        self.folded_round = 0
+        self.result = None
+
+    def shown(self):
+        # Table cards face up for the player in the current round
+        return self.table_cards[:REVEALED_CARDS.get(self.betting_round, 5)]
+
+    def act(self, action):
+        if self.result is not None:
+            raise ValueError("The deal is already over.")
+        if action == "FOLD":
+            self.action += "F"
+            self.folded_round = self.betting_round
+            return self._finish()
+        self.action += "S/"
+        if self.betting_round == 4:
+            return self._finish()
+        self.betting_round += 1
+        return None
+
+    def _finish(self):
+        player_value = self.evaluate(self.player_hole + self.table_cards)
+        dealer_value = self.evaluate(self.dealer_hole + self.table_cards)
+        self.betting_round = 0
+        self.result = GameResult(self.player_hole, self.dealer_hole, self.table_cards,
+                                 self.action, self.folded_round, player_value, dealer_value,
+                                 score_game(player_value, dealer_value, self.folded_round),
+                                 self.seed)
+        return self.result
+
+
+class PokerEngine:
+    def __init__(self, strategy=always_stay, seed=None, evaluator=evaluate):
+        # evaluator can be swapped for e.g. a HandCache(...).evaluate
+        self.strategy = strategy
+        self.evaluate = evaluator
+        self.rng = random.Random(seed)
+        self.deck = FastDeck(self.rng)
+
+    def next_seed(self):
+        # Never 0, which logs use for "not seeded"
+        return self.rng.getrandbits(64) or 1
+
+    def deal(self, seed=0):
+        """Same order as PokerGame always dealt: dealer and player
+        alternate twice, then five table cards. With a seed the deal is
+        reproducible from it alone (reseeding costs a few microseconds,
+        so plain runs keep drawing from the engine's one RNG)."""
+        if seed:
+            self.deck.reseed(seed)
+        else:
+            self.deck.reset()
+        cards = self.deck.deal_many(9)
+        return [cards[0], cards[2]], [cards[1], cards[3]], cards[4:]
+
+    def new_game(self, seed=0):
+        dealer_hole, player_hole, table_cards = self.deal(seed)
+        return GameState(player_hole, dealer_hole, table_cards, self.evaluate, seed)
+
+    def play(self, player_hole=None, dealer_hole=None, table_cards=None, seed=0):
+        if player_hole is None:
+            state = self.new_game(seed)
+        else:
+            state = GameState(player_hole, dealer_hole, table_cards, self.evaluate)
+        strategy = self.strategy
+        while state.result is None:
+            state.act(strategy(state.player_hole, state.shown(), state.betting_round))
+        return state.result
+
+    def run(self, games, seeded=False):
+        """Yields one GameResult per deal, so long runs use constant memory.
+        seeded gives every deal its own seed, recorded in the result."""
+        for _ in range(games):
+            yield self.play(seed=self.next_seed() if seeded else 0)
@@ -0,0 +1,186 @@
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb
+from poker_eval import (CARD_INDEX, RANK_KEY, RANK_BIT, POPCOUNT, FLUSH_TABLE,
+                        RANK_TABLE, FULL_DECK, evaluate, cards_to_mask,
+                        mask_to_cards)
+from poker_engine import FastDeck, fold_points
+
+# Monte Carlo equity for the solitaire format: the player knows their hole
+# cards and the revealed table cards; the dealer's hole and the rest of the
+# board are unknown. Samples are split into fixed-size chunks, each with
+# its own seed, and merged in chunk order, so a given seed gives the same
+# answer no matter how many worker processes run it.
+
+CHUNK_SIZE = 20000
+
+# Above this many dealer-hole/board completions, sample instead of enumerating
+EXACT_LIMIT = 50000
+
+EquityResult = namedtuple("EquityResult", [
+    "samples", "win", "draw", "loss", "stay", "fold", "betting_round"])
+
+# Betting round the player is in, from the number of table cards showing
+BETTING_ROUNDS = {0: 1, 3: 2, 4: 3, 5: 4}
+
+
+def to_cards(cards):
+    # Accepts ints or names like "AH" / "TD"
+    return [CARD_INDEX[c] if isinstance(c, str) else c for c in cards]
+
+
+def betting_round_for(table_cards):
+    if len(table_cards) not in BETTING_ROUNDS:
+        raise ValueError("Table cards are revealed 0, 3, 4 or 5 at a time.")
+    return BETTING_ROUNDS[len(table_cards)]
+
+
+def unseen_cards(known):
+    if any(not 0 <= c < 52 for c in known):
+        raise ValueError("Check your cards")
+    dead = cards_to_mask(known)
+    if dead.bit_count() != len(known):
+        raise ValueError("Check your cards")
+    return mask_to_cards(FULL_DECK & ~dead)
+
+
+def chunk_seed(seed, index):
+    return f"{seed}:{index}"
+
+
+def _sample_chunk(player_hole, table_cards, samples, seed):
+    deck = FastDeck(random.Random(seed), player_hole + table_cards)
+    missing = 7 - len(table_cards)
+    wins = draws = 0
+    for _ in range(samples):
+        deck.reset()
+        drawn = deck.deal_many(missing)
+        board = table_cards + drawn[2:]
+        player = evaluate(player_hole + board)
+        dealer = evaluate(drawn[:2] + board)
+        if player > dealer:
+            wins += 1
+        elif player == dealer:
+            draws += 1
+    return wins, draws, samples - wins - draws
+
+
+def make_result(wins, draws, losses, betting_round):
+    """Turns merged counts into probabilities and the expected score of
+    staying to showdown versus folding now."""
+    samples = wins + draws + losses
+    win, draw, loss = wins / samples, draws / samples, losses / samples
+    return EquityResult(samples, win, draw, loss,
+                        100 * (win - loss),
+                        fold_points(betting_round) * (loss - win),
+                        betting_round)
+
+
+def equity(player_hole, table_cards=(), samples=200000, workers=None, seed=0):
+    player_hole = to_cards(player_hole)
+    table_cards = to_cards(table_cards)
+    betting_round = betting_round_for(table_cards)
+    if len(player_hole) != 2:
+        raise ValueError("The player's hole has two cards.")
+    if samples <= 0:
+        raise ValueError("samples must be positive.")
+    unseen_cards(player_hole + table_cards)
+
+    chunks = []
+    for index, start in enumerate(range(0, samples, CHUNK_SIZE)):
+        size = min(CHUNK_SIZE, samples - start)
+        chunks.append((player_hole, table_cards, size, chunk_seed(seed, index)))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(chunks))
+    if workers <= 1:
+        counts = [_sample_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_sample_chunk, *zip(*chunks)))
+
+    wins = sum(c[0] for c in counts)
+    draws = sum(c[1] for c in counts)
+    losses = sum(c[2] for c in counts)
+    return make_result(wins, draws, losses, betting_round)
+
+
+def completions(table_cards):
+    """Number of (rest of board, dealer hole) outcomes left to enumerate."""
+    unseen = 50 - len(table_cards)
+    missing = 5 - len(table_cards)
+    return comb(unseen, missing) * comb(unseen - missing, 2)
+
+
+def _dealer_evaluator(board):
+    # Everything about the full board is worked out once; each dealer hole
+    # then only adds its two cards to the rank key and, when the board has
+    # three or more of one suit, to that suit's mask.
+    key = sum(RANK_KEY[c] for c in board)
+    suit_counts = [0, 0, 0, 0]
+    for c in board:
+        suit_counts[c & 3] += 1
+    flush_suit = max(range(4), key=suit_counts.__getitem__)
+    if suit_counts[flush_suit] < 3:
+        return lambda a, b: RANK_TABLE[key + RANK_KEY[a] + RANK_KEY[b]]
+    suit_mask = 0
+    for c in board:
+        if c & 3 == flush_suit:
+            suit_mask |= RANK_BIT[c]
+
+    def dealer_value(a, b):
+        mask = suit_mask
+        if a & 3 == flush_suit:
+            mask |= RANK_BIT[a]
+        if b & 3 == flush_suit:
+            mask |= RANK_BIT[b]
+        if POPCOUNT[mask] >= 5:
+            return FLUSH_TABLE[mask]
+        return RANK_TABLE[key + RANK_KEY[a] + RANK_KEY[b]]
+    return dealer_value
+
+
+def showdown_counts(player_hole, board, unseen):
+    """(wins, draws, losses) against every dealer hole from unseen, for a
+    complete five-card board."""
+    player = evaluate(player_hole + board)
+    dealer_value = _dealer_evaluator(board)
+    wins = draws = losses = 0
+    for a, b in combinations(unseen, 2):
+        dealer = dealer_value(a, b)
+        if player > dealer:
+            wins += 1
+        elif player == dealer:
+            draws += 1
+        else:
+            losses += 1
+    return wins, draws, losses
+
+
+def exact_equity(player_hole, table_cards=()):
+    """Enumerates every rest of the board and dealer hole from the unseen
+    cards; practical from betting round 3 on (at most ~46k outcomes)."""
+    player_hole = to_cards(player_hole)
+    table_cards = to_cards(table_cards)
+    betting_round = betting_round_for(table_cards)
+    remaining = unseen_cards(player_hole + table_cards)
+    wins = draws = losses = 0
+    for rest in combinations(remaining, 5 - len(table_cards)):
+        left = [c for c in remaining if c not in rest]
+        w, d, l = showdown_counts(player_hole, table_cards + list(rest), left)
+        wins += w
+        draws += d
+        losses += l
+    return make_result(wins, draws, losses, betting_round)
+
+
+def analyze(player_hole, table_cards=(), samples=200000, workers=None, seed=0,
+            exact_limit=EXACT_LIMIT):
+    """Exact enumeration when the outcomes are few enough, else Monte Carlo."""
+    if completions(to_cards(table_cards)) <= exact_limit:
+        return exact_equity(player_hole, table_cards)
+    return equity(player_hole, table_cards, samples, workers, seed)
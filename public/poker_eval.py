@@ -0,0 +1,381 @@
+import threading
+from collections import OrderedDict
+
+# Cards are small ints: rank_index * 4 + suit_index, using the same
+# orderings as Card.Ranks / Card.Suits in pokergame3.py.
+RANKS = "23456789TJQKA"
+SUITS = "HDCS"
+
+HAND_RANKINGS = [
+    "Straight Flush",
+    "Four of a Kind",
+    "Full House",
+    "Flush",
+    "Straight",
+    "Three of a Kind",
+    "Two Pair",
+    "One Pair",
+    "High Card"
+]
+
+HIGH_CARD = 0
+ONE_PAIR = 1
+TWO_PAIR = 2
+THREE_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_KIND = 7
+STRAIGHT_FLUSH = 8
+
+# A hand strength is category << 20 followed by up to five 4-bit rank
+# nibbles (primary ranks first, then kickers), so plain int comparison
+# orders hands correctly.
+CATEGORY_SHIFT = 20
+
+CARD_INDEX = {r + s: ri * 4 + si
+              for ri, r in enumerate(RANKS) for si, s in enumerate(SUITS)}
+CARD_NAMES = [r + s for r in RANKS for s in SUITS]
+
+# Base-5 digit per rank: a rank can appear at most 4 times, so the sum over
+# a hand is a unique key for its rank histogram.
+RANK_KEY = [5 ** (c >> 2) for c in range(52)]
+RANK_BIT = [1 << (c >> 2) for c in range(52)]
+
+# Sets of cards (hands, boards, dead cards) as 52-bit masks
+CARD_BIT = [1 << c for c in range(52)]
+FULL_DECK = (1 << 52) - 1
+
+
+def encode_card(rank, suit):
+    return CARD_INDEX[rank + suit]
+
+
+def card_name(card):
+    return CARD_NAMES[card]
+
+
+def cards_to_mask(cards):
+    mask = 0
+    for c in cards:
+        mask |= CARD_BIT[c]
+    return mask
+
+
+def mask_to_cards(mask):
+    # Lowest card first
+    cards = []
+    while mask:
+        low = mask & -mask
+        cards.append(low.bit_length() - 1)
+        mask ^= low
+    return cards
+
+
+def _pack(category, ranks):
+    strength = category
+    for i in range(5):
+        strength = (strength << 4) | (ranks[i] if i < len(ranks) else 0)
+    return strength
+
+
+def _straight_high(mask):
+    for high in range(12, 3, -1):
+        run = 0b11111 << (high - 4)
+        if mask & run == run:
+            return high
+    # Ace-low straight (wheel), topped by the five
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return -1
+
+
+def _top_bits(mask, n):
+    ranks = []
+    for r in range(12, -1, -1):
+        if mask >> r & 1:
+            ranks.append(r)
+            if len(ranks) == n:
+                break
+    return ranks
+
+
+def _build_bit_tables():
+    popcount = [0] * 8192
+    straight = [-1] * 8192
+    flush = [0] * 8192
+    for mask in range(1, 8192):
+        popcount[mask] = popcount[mask >> 1] + (mask & 1)
+        straight[mask] = _straight_high(mask)
+        if popcount[mask] >= 5:
+            if straight[mask] >= 0:
+                flush[mask] = _pack(STRAIGHT_FLUSH, [straight[mask]])
+            else:
+                flush[mask] = _pack(FLUSH, _top_bits(mask, 5))
+    return popcount, straight, flush
+
+
+POPCOUNT, STRAIGHT_HIGH, FLUSH_TABLE = _build_bit_tables()
+
+
+def _score_histogram(counts):
+    # counts[r] = number of cards of rank r; suits are handled by FLUSH_TABLE
+    present = [r for r in range(12, -1, -1) if counts[r]]
+    quads = [r for r in present if counts[r] == 4]
+    trips = [r for r in present if counts[r] == 3]
+    pairs = [r for r in present if counts[r] == 2]
+
+    if quads:
+        return _pack(FOUR_KIND, [quads[0]] + [r for r in present if r != quads[0]][:1])
+    if trips and (len(trips) > 1 or pairs):
+        return _pack(FULL_HOUSE, [trips[0], max(trips[1:] + pairs)])
+    mask = 0
+    for r in present:
+        mask |= 1 << r
+    if STRAIGHT_HIGH[mask] >= 0:
+        return _pack(STRAIGHT, [STRAIGHT_HIGH[mask]])
+    if trips:
+        return _pack(THREE_KIND, trips + [r for r in present if r != trips[0]][:2])
+    if len(pairs) >= 2:
+        top = pairs[:2]
+        return _pack(TWO_PAIR, top + [r for r in present if r not in top][:1])
+    if pairs:
+        return _pack(ONE_PAIR, pairs + [r for r in present if r != pairs[0]][:3])
+    return _pack(HIGH_CARD, present[:5])
+
+
+class _RankTable(dict):
+    # Rank-histogram table, keyed by the sum of RANK_KEY over a hand. The
+    # 76k entries for up to seven cards are filled on first use, so
+    # importing the module stays cheap; call fill() to build them all up
+    # front (e.g. before forking workers).
+
+    def __missing__(self, key):
+        counts = []
+        k = key
+        for _ in range(13):
+            counts.append(k % 5)
+            k //= 5
+        strength = self[key] = _score_histogram(counts)
+        return strength
+
+    def fill(self, max_cards=7):
+        counts = [0] * 13
+        digits = [5 ** r for r in range(13)]
+
+        def walk(rank, left, key):
+            if rank == 13:
+                if key not in self:
+                    self[key] = _score_histogram(counts)
+                return
+            for n in range(min(4, left) + 1):
+                counts[rank] = n
+                walk(rank + 1, left - n, key + n * digits[rank])
+            counts[rank] = 0
+
+        walk(0, max_cards, 0)
+        return self
+
+
+RANK_TABLE = _RankTable()
+
+
+def evaluate(cards):
+    """Returns the strength of the best five-card hand in cards (ints),
+    as an int that compares the same way the hands do."""
+    key = 0
+    s0 = s1 = s2 = s3 = 0
+    for c in cards:
+        key += RANK_KEY[c]
+        suit = c & 3
+        if suit == 0:
+            s0 |= RANK_BIT[c]
+        elif suit == 1:
+            s1 |= RANK_BIT[c]
+        elif suit == 2:
+            s2 |= RANK_BIT[c]
+        else:
+            s3 |= RANK_BIT[c]
+    for mask in (s0, s1, s2, s3):
+        if POPCOUNT[mask] >= 5:
+            return FLUSH_TABLE[mask]
+    return RANK_TABLE[key]
+
+
+def category(strength):
+    return strength >> CATEGORY_SHIFT
+
+
+def category_name(strength):
+    return HAND_RANKINGS[STRAIGHT_FLUSH - (strength >> CATEGORY_SHIFT)]
+
+
+# How many rank nibbles are meaningful for each category
+_RANK_COUNTS = [5, 4, 3, 3, 1, 5, 2, 2, 1]
+
+
+class HandValue(int):
+    """A hand's comparison key: category, primary ranks, then kickers,
+    packed into one int so two hands compare in O(1)."""
+    __slots__ = ()
+
+    @property
+    def category(self):
+        return self >> CATEGORY_SHIFT
+
+    @property
+    def name(self):
+        return category_name(self)
+
+    @property
+    def ranks(self):
+        n = _RANK_COUNTS[self >> CATEGORY_SHIFT]
+        return [RANKS[(self >> (16 - 4 * i)) & 15] for i in range(n)]
+
+    def __repr__(self):
+        return f"HandValue({self.name}: {' '.join(self.ranks)})"
+
+
+def hand_value(cards):
+    return HandValue(evaluate(cards))
+
+
+class HandState:
+    """A hand built up one card at a time, e.g. as table cards are revealed
+    round by round. add() and remove() are O(1): they update the rank
+    histogram key, the rank bitmask and the per-suit counts and masks, so
+    value() is two table lookups rather than a fresh evaluation."""
+
+    def __init__(self, cards=()):
+        self.cards = []
+        self.key = 0
+        self.rank_counts = [0] * 13
+        self.rank_mask = 0
+        self.suit_counts = [0, 0, 0, 0]
+        self.suit_masks = [0, 0, 0, 0]
+        for c in cards:
+            self.add(c)
+
+    def add(self, card):
+        rank, suit = card >> 2, card & 3
+        self.cards.append(card)
+        self.key += RANK_KEY[card]
+        self.rank_counts[rank] += 1
+        self.rank_mask |= RANK_BIT[card]
+        self.suit_counts[suit] += 1
+        self.suit_masks[suit] |= RANK_BIT[card]
+
+    def remove(self, card):
+        # Removing the most recently added card is O(1); others are found
+        # by a scan of at most seven cards
+        if self.cards and self.cards[-1] == card:
+            self.cards.pop()
+        else:
+            self.cards.remove(card)
+        rank, suit = card >> 2, card & 3
+        self.key -= RANK_KEY[card]
+        self.rank_counts[rank] -= 1
+        if not self.rank_counts[rank]:
+            self.rank_mask &= ~RANK_BIT[card]
+        self.suit_counts[suit] -= 1
+        self.suit_masks[suit] &= ~RANK_BIT[card]
+
+    def value(self):
+        for suit in range(4):
+            if self.suit_counts[suit] >= 5:
+                return FLUSH_TABLE[self.suit_masks[suit]]
+        return RANK_TABLE[self.key]
+
+    def category(self):
+        return self.value() >> CATEGORY_SHIFT
+
+    def category_name(self):
+        return category_name(self.value())
+
+    def has_straight(self):
+        return STRAIGHT_HIGH[self.rank_mask] >= 0
+
+    def outs(self, dead=(), target=None):
+        """Unseen cards that would lift the hand to a better category, or
+        above the strength target when one is given."""
+        if target is None:
+            # Weakest strength of the next category up, minus one
+            target = ((self.category() + 1) << CATEGORY_SHIFT) - 1
+        seen = cards_to_mask(self.cards) | cards_to_mask(dead)
+        outs = []
+        for card in range(52):
+            if seen & CARD_BIT[card]:
+                continue
+            self.add(card)
+            if self.value() > target:
+                outs.append(card)
+            self.remove(card)
+        return outs
+
+
+def canonical_key(cards):
+    """Key that is the same for every suit relabelling of the hand: the
+    per-suit rank masks, sorted and packed into one int."""
+    s0 = s1 = s2 = s3 = 0
+    for c in cards:
+        suit = c & 3
+        if suit == 0:
+            s0 |= RANK_BIT[c]
+        elif suit == 1:
+            s1 |= RANK_BIT[c]
+        elif suit == 2:
+            s2 |= RANK_BIT[c]
+        else:
+            s3 |= RANK_BIT[c]
+    a, b, c, d = sorted((s0, s1, s2, s3))
+    return (((a << 13 | b) << 13) | c) << 13 | d
+
+
+class HandCache:
+    """Bounded LRU cache in front of evaluate(), keyed by canonical_key so
+    suit-isomorphic hands share an entry. The lock makes one instance safe
+    to share between threads of a worker process."""
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def evaluate(self, cards):
+        key = canonical_key(cards)
+        with self.lock:
+            strength = self.entries.get(key)
+            if strength is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return strength
+            self.misses += 1
+        strength = evaluate(cards)
+        with self.lock:
+            self.entries[key] = strength
+            if self.maxsize is not None and len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return strength
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,105 @@
+import struct
+from collections import namedtuple
+from poker_eval import evaluate
+from poker_engine import score_game
+
+# Compact binary game log. A file is a short header followed by fixed-size
+# 21-byte records:
+#   seed (uint64, 0 = deal not seeded), player hole (2), dealer hole (2),
+#   table cards (5), number of STAYs, folded_round (0 = played to
+#   showdown), score (int16)
+# The action string is rebuilt from the STAY count and folded_round.
+
+MAGIC = b"PLOG"
+VERSION = 1
+HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<Q9BBBh")
+BUFFER_SIZE = 1 << 20
+READ_RECORDS = 4096
+
+GameRecord = namedtuple("GameRecord", [
+    "seed", "player_hole", "dealer_hole", "table_cards",
+    "action", "folded_round", "score"])
+
+
+def action_string(stays, folded_round):
+    return "S/" * stays + ("F" if folded_round else "")
+
+
+class GameRecorder:
+    """Appends one record per deal through a large write buffer, so
+    logging costs a struct.pack per game."""
+
+    def __init__(self, path):
+        self.file = open(path, "ab", buffering=BUFFER_SIZE)
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.games = 0
+
+    def write(self, player_hole, dealer_hole, table_cards, action,
+              folded_round, score, seed=0):
+        self.file.write(RECORD.pack(seed, *player_hole, *dealer_hole,
+                                    *table_cards, action.count("S"),
+                                    folded_round, score))
+        self.games += 1
+
+    def write_result(self, result):
+        # result is a poker_engine.GameResult
+        self.write(result.player_hole, result.dealer_hole, result.table_cards,
+                   result.action, result.folded_round, result.score, result.seed)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_games(path):
+    """Yields GameRecords one at a time, reading the file in blocks, so
+    memory stays flat however long the log is."""
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        magic, version = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a poker game log: " + path)
+        while True:
+            block = file.read(RECORD.size * READ_RECORDS)
+            if not block:
+                break
+            usable = len(block) - len(block) % RECORD.size  # drop a torn tail
+            for fields in RECORD.iter_unpack(block[:usable]):
+                yield GameRecord(fields[0], list(fields[1:3]), list(fields[3:5]),
+                                 list(fields[5:10]), action_string(fields[10], fields[11]),
+                                 fields[11], fields[12])
+
+
+def rescore(path):
+    """Replays every logged deal through the current evaluator and yields
+    (record, score) pairs, e.g. to spot games whose score changed."""
+    for record in read_games(path):
+        player_value = evaluate(record.player_hole + record.table_cards)
+        dealer_value = evaluate(record.dealer_hole + record.table_cards)
+        yield record, score_game(player_value, dealer_value, record.folded_round)
+
+
+def record_games(engine, games, path):
+    """Plays and logs games seeded deals; engine.play(seed=record.seed)
+    deals any of them again."""
+    with GameRecorder(path) as recorder:
+        for result in engine.run(games, seeded=True):
+            recorder.write_result(result)
+    return games
+
+
+def summarize(path):
+    games = total = 0
+    for record in read_games(path):
+        games += 1
+        total += record.score
+    return {"games_played": games, "average point": total / games if games else 0}
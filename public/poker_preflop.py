@@ -0,0 +1,112 @@
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from poker_eval import RANKS
+from poker_equity import (CHUNK_SIZE, EquityResult, _sample_chunk, chunk_seed,
+                          make_result, to_cards)
+
+# Preflop (betting round 1) equity for the 169 starting-hand classes.
+# Classes live in a 13x13 grid: pairs on the diagonal, suited hands at
+# [high][low] and offsuit hands at [low][high]. The table file is a small
+# header followed by 169 rows of float32 win, draw, loss, stay, fold, where
+# stay is the expected score of staying to showdown and fold that of
+# folding now. Staying keeps the option to fold later, which stay leaves
+# out, so comparing the two is not a STAY/FOLD decision; poker_solver
+# values that option.
+
+DEFAULT_PATH = "preflop_equity.bin"
+MAGIC = b"PFEQ"
+VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, samples per class
+FIELDS = 5
+CLASSES = 169
+
+
+def class_index(player_hole):
+    first, second = to_cards(player_hole)
+    high, low = max(first >> 2, second >> 2), min(first >> 2, second >> 2)
+    if (first & 3) == (second & 3) and high != low:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_name(index):
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANKS[row] * 2
+    if row > col:
+        return RANKS[row] + RANKS[col] + "s"
+    return RANKS[col] + RANKS[row] + "o"
+
+
+def representative(index):
+    # Any two cards of the class will do; equity only depends on the class
+    row, col = divmod(index, 13)
+    if row == col:
+        return [row * 4, row * 4 + 1]
+    if row > col:
+        return [row * 4, col * 4]
+    return [col * 4, row * 4 + 1]
+
+
+def generate(path=DEFAULT_PATH, samples=100000, workers=None, seed=0):
+    """Simulates every class once, in parallel, and writes the table."""
+    jobs = []
+    for index in range(CLASSES):
+        for chunk, start in enumerate(range(0, samples, CHUNK_SIZE)):
+            size = min(CHUNK_SIZE, samples - start)
+            jobs.append((representative(index), [], size,
+                         chunk_seed(f"{seed}/{index}", chunk)))
+    counts = [[0, 0, 0] for _ in range(CLASSES)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_sample_chunk, *zip(*jobs), chunksize=4)
+        for job, result in zip(jobs, results):
+            totals = counts[class_index(job[0])]
+            for i in range(3):
+                totals[i] += result[i]
+
+    rows = []
+    for wins, draws, losses in counts:
+        result = make_result(wins, draws, losses, 1)
+        rows.extend([result.win, result.draw, result.loss, result.stay, result.fold])
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, samples))
+        file.write(struct.pack(f"<{len(rows)}f", *rows))
+    os.replace(tmp_path, path)
+
+
+class PreflopTable:
+    """Memory-mapped preflop table; lookups read straight from the map."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.samples = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a preflop equity table: " + path)
+        if len(self.map) != HEADER.size + CLASSES * FIELDS * 4:
+            raise ValueError("Preflop equity table is truncated: " + path)
+        self.values = memoryview(self.map)[HEADER.size:].cast("f")
+
+    def lookup(self, player_hole):
+        start = class_index(player_hole) * FIELDS
+        win, draw, loss, stay, fold = self.values[start:start + FIELDS]
+        return EquityResult(self.samples, win, draw, loss, stay, fold, 1)
+
+    def close(self):
+        self.values.release()
+        self.map.close()
+
+
+if __name__ == "__main__":
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH
+    generate(path, samples)
+    table = PreflopTable(path)
+    for index in range(CLASSES):
+        result = table.lookup(representative(index))
+        print(f"{class_name(index):4} win {result.win:.3f}  stay to showdown {result.stay:7.2f}  fold {result.fold:7.2f}")
+    table.close()
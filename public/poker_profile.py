@@ -0,0 +1,108 @@
+import atexit
+import builtins
+import functools
+import json
+import time
+import poker_engine
+
+# Opt-in timing for the PokerGame hot paths. Nothing is wrapped until
+# install() is called, so a normal run pays no overhead at all; install()
+# swaps timed wrappers onto the classes and restore() puts the originals
+# back. pokergame3 calls install() when POKER_PROFILE is set.
+
+# (class name, method) pairs timed in the pokergame3 module
+TARGETS = [
+    ("PokerGame", "deal_initial_cards"),
+    ("PokerGame", "evaluate_and_results"),
+    ("PokerGame", "stay"),
+    ("PokerGame", "fold"),
+    ("PokerGame", "finish_deal"),
+    ("PokerGame", "reset_game"),
+    ("CardSlot", "show"),
+]
+
+# (class name, method) pairs timed in poker_engine, which the GUI plays
+# through; GameState._finish is where both hands get evaluated
+ENGINE_TARGETS = [
+    ("GameState", "_finish"),
+]
+
+
+class Profiler:
+    def __init__(self):
+        self.calls = {}
+        self.seconds = {}
+        self.patched = []
+
+    def timed(self, name, func):
+        calls, seconds = self.calls, self.seconds
+        calls.setdefault(name, 0)
+        seconds.setdefault(name, 0.0)
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds[name] += clock() - start
+                calls[name] += 1
+        return wrapper
+
+    def patch(self, owner, attr, name):
+        original = owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr, None)
+        self.patched.append((owner, attr, original))
+        setattr(owner, attr, self.timed(name, original or getattr(builtins, attr)))
+
+    def restore(self):
+        for owner, attr, original in reversed(self.patched):
+            if original is None:
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, original)
+        self.patched = []
+
+    def stats(self):
+        """{name: {"calls", "seconds", "mean_us"}}, slowest total first."""
+        rows = {}
+        for name in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            calls = self.calls[name]
+            rows[name] = {
+                "calls": calls,
+                "seconds": self.seconds[name],
+                "mean_us": self.seconds[name] / calls * 1e6 if calls else 0.0,
+            }
+        return rows
+
+    def reset(self):
+        for name in self.calls:
+            self.calls[name] = 0
+            self.seconds[name] = 0.0
+
+    def report(self):
+        lines = [f"{'call':34} {'calls':>9} {'seconds':>10} {'mean us':>10}"]
+        for name, row in self.stats().items():
+            lines.append(f"{name:34} {row['calls']:>9} {row['seconds']:>10.4f} {row['mean_us']:>10.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "w") as file:
+            json.dump(self.stats(), file, indent=2)
+
+
+def install(module, path=None, profiler=None):
+    """Times the TARGETS in module (pokergame3 or __main__), the
+    ENGINE_TARGETS in poker_engine, plus every print call made from module.
+    With a path, the stats are written there at exit."""
+    profiler = profiler or Profiler()
+    for targets, source in ((TARGETS, module), (ENGINE_TARGETS, poker_engine)):
+        for class_name, method in targets:
+            owner = getattr(source, class_name, None)
+            if owner is not None and method in owner.__dict__:
+                profiler.patch(owner, method, f"{class_name}.{method}")
+    # A module-level print shadows the builtin for that module only
+    profiler.patch(module, "print", "print")
+    if path:
+        atexit.register(profiler.dump, path)
+    return profiler
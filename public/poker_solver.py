@@ -0,0 +1,210 @@
+import bisect
+import mmap
+import random
+import struct
+import sys
+from collections import namedtuple
+from itertools import permutations
+from poker_engine import fold_points
+from poker_equity import betting_round_for, equity, showdown_counts, to_cards, unseen_cards
+from poker_stats import simulate
+
+# Expected-score-maximizing STAY/FOLD play for the solitaire rules, by
+# backward induction over information states (player's hole plus the
+# revealed table cards). Round 4 is solved against all 990 dealer holes,
+# rounds 3 and 2 average the best value over every next table card.
+#
+# Round 1 can't enumerate its 19,600 flops in Python (about half a second
+# each), so it is split in two. Its win/draw/loss odds, and with them the
+# fold value and the value of staying to showdown, come from poker_equity
+# (or a poker_preflop table). Only the value of being able to fold later
+# is averaged over a seeded sample of flops: per flop, the best of staying
+# and folding minus staying to showdown. That varies far less from flop
+# to flop than the flop's value itself, so a couple of hundred flops pin it down.
+#
+# States are memoized under a suit-canonical key, so suit-isomorphic holes
+# and boards are solved once.
+
+Decision = namedtuple("Decision", ["action", "stay", "fold", "wins", "draws", "losses"])
+
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+DEFAULT_PATH = "poker_policy.bin"
+MAGIC = b"PPOL"
+VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, number of states
+
+
+def _pack_state(hole, board):
+    # Card + 1 in six bits per slot; hole in the low 12 bits, board above
+    key = 0
+    for c in reversed(board):
+        key = key << 6 | (c + 1)
+    for c in reversed(hole):
+        key = key << 6 | (c + 1)
+    return key
+
+
+def canonical_state(hole, board):
+    """Smallest packed key over all 24 suit relabellings of the state."""
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        key = _pack_state(sorted((c & ~3) | perm[c & 3] for c in hole),
+                          sorted((c & ~3) | perm[c & 3] for c in board))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+class Solver:
+    def __init__(self, flop_samples=200, seed=0, preflop=None, preflop_samples=200000):
+        # preflop is an optional poker_preflop.PreflopTable for the round-1
+        # odds; without one they are simulated with preflop_samples deals
+        self.flop_samples = flop_samples
+        self.seed = seed
+        self.preflop = preflop
+        self.preflop_samples = preflop_samples
+        self.memo = {}
+
+    def solve(self, player_hole, table_cards=()):
+        player_hole = to_cards(player_hole)
+        table_cards = to_cards(table_cards)
+        betting_round_for(table_cards)
+        unseen_cards(player_hole + table_cards)
+        return self._solve(player_hole, table_cards)
+
+    def action(self, player_hole, table_cards=()):
+        return self.solve(player_hole, table_cards).action
+
+    def _solve(self, hole, board):
+        key = canonical_state(hole, board)
+        decision = self.memo.get(key)
+        if decision is None:
+            decision = self.memo[key] = self._backward(hole, board)
+        return decision
+
+    def _backward(self, hole, board):
+        betting_round = betting_round_for(board)
+        if betting_round == 1:
+            return self._preflop(hole)
+        unseen = unseen_cards(hole + board)
+        if betting_round == 4:
+            wins, draws, losses = showdown_counts(hole, board, unseen)
+            total = wins + draws + losses
+            stay = 100 * (wins - losses) / total
+        else:
+            wins = draws = losses = 0
+            stay = 0.0
+            for c in unseen:
+                child = self._solve(hole, board + [c])
+                stay += max(child.stay, child.fold)
+                wins += child.wins
+                draws += child.draws
+                losses += child.losses
+            stay /= len(unseen)
+            total = wins + draws + losses
+        fold = fold_points(betting_round) * (losses - wins) / total
+        action = "STAY" if stay >= fold else "FOLD"
+        return Decision(action, stay, fold, wins, draws, losses)
+
+    def _preflop(self, hole):
+        # Odds and flops are drawn for the suit-canonical hole (flops
+        # relabelled back), so every hole of a suit class gets the same
+        # values whichever is solved first
+        perm = min(SUIT_PERMUTATIONS,
+                   key=lambda p: _pack_state(sorted((c & ~3) | p[c & 3] for c in hole), []))
+        back = [0] * 4
+        for suit, new_suit in enumerate(perm):
+            back[new_suit] = suit
+        canonical = sorted((c & ~3) | perm[c & 3] for c in hole)
+        if self.preflop is not None:
+            odds = self.preflop.lookup(canonical)
+        else:
+            odds = equity(canonical, (), self.preflop_samples, workers=1, seed=self.seed)
+        wins, draws, losses = (round(p * odds.samples) for p in (odds.win, odds.draw, odds.loss))
+        total = wins + draws + losses
+
+        rng = random.Random(f"{self.seed}:{_pack_state(canonical, [])}")
+        unseen = unseen_cards(canonical)
+        option = 0.0
+        for _ in range(self.flop_samples):
+            flop = [(c & ~3) | back[c & 3] for c in rng.sample(unseen, 3)]
+            child = self._solve(hole, flop)
+            showdown = 100 * (child.wins - child.losses) / (child.wins + child.draws + child.losses)
+            option += max(child.stay, child.fold) - showdown
+        stay = 100 * (wins - losses) / total + option / self.flop_samples
+        fold = fold_points(1) * (losses - wins) / total
+        action = "STAY" if stay >= fold else "FOLD"
+        return Decision(action, stay, fold, wins, draws, losses)
+
+    def strategy(self, player_hole, table_cards, betting_round):
+        # Plugs straight into PokerEngine
+        return self._solve(player_hole, table_cards).action
+
+    def export(self, path=DEFAULT_PATH):
+        """Writes every solved state as sorted uint64 keys followed by
+        float32 (stay, fold) pairs."""
+        keys = sorted(self.memo)
+        values = []
+        for key in keys:
+            values.extend((self.memo[key].stay, self.memo[key].fold))
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+            file.write(struct.pack(f"<{len(keys)}Q", *keys))
+            file.write(struct.pack(f"<{len(values)}f", *values))
+
+
+class PolicyTable:
+    """Memory-mapped policy written by Solver.export; lookups bisect the
+    sorted key array in place."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a poker policy file: " + path)
+        view = memoryview(self.map)
+        keys_end = HEADER.size + count * 8
+        self.keys = view[HEADER.size:keys_end].cast("Q")
+        self.values = view[keys_end:keys_end + count * 8].cast("f")
+
+    def lookup(self, player_hole, table_cards=()):
+        """(stay, fold) expected scores, or None for an unsolved state."""
+        key = canonical_state(to_cards(player_hole), to_cards(table_cards))
+        i = bisect.bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        return self.values[2 * i], self.values[2 * i + 1]
+
+    def action(self, player_hole, table_cards=()):
+        values = self.lookup(player_hole, table_cards)
+        if values is None:
+            return None
+        return "STAY" if values[0] >= values[1] else "FOLD"
+
+    def close(self):
+        self.keys.release()
+        self.values.release()
+        self.map.close()
+
+
+def measure(games=10000, seed=0, solver=None, workers=1):
+    """poker_stats.SessionStats of the solver's policy over seeded engine
+    deals. One game's score has a standard deviation near 100, so it takes
+    about 10^4 games to pin the average down to +-2. With workers > 1 each
+    process solves on its own copy of the solver, leaving solver.memo as
+    it was."""
+    solver = solver or Solver(seed=seed)
+    return simulate(solver.strategy, games, workers, seed)
+
+
+if __name__ == "__main__":
+    # Slow: every flop met for the first time takes about half a second
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    solver = Solver()
+    overall = measure(games, solver=solver).overall
+    low, high = overall.confidence_interval()
+    print(f"Average score over {overall.count} games: {overall.mean:.2f} "
+          f"(95% CI {low:.2f} to {high:.2f}, stdev {overall.stdev():.1f})")
+    print(f"Solved states: {len(solver.memo)}")
+    solver.export()
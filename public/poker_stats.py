@@ -0,0 +1,136 @@
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from poker_eval import HAND_RANKINGS, STRAIGHT_FLUSH, CATEGORY_SHIFT
+from poker_engine import PokerEngine, always_stay
+
+# Online session statistics: every game updates a handful of running
+# aggregates in O(1), so 10^7-game runs never keep or rescan history.
+# Breakdowns are columns indexed by the player's final hand category and by
+# folded_round (0 = played to showdown).
+
+
+class RunningStats:
+    """Count, mean and variance of a stream via Welford's update; two
+    instances merge exactly with Chan et al.'s pairwise formula."""
+    __slots__ = ("count", "mean", "m2", "low", "high")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = None
+        self.high = None
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if self.low is None or x < self.low:
+            self.low = x
+        if self.high is None or x > self.high:
+            self.high = x
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.low, self.high = other.low, other.high
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+        return self
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def stdev(self):
+        return math.sqrt(self.variance())
+
+    def confidence_interval(self, z=1.96):
+        """Normal-approximation interval for the mean (95% by default)."""
+        if not self.count:
+            return (0.0, 0.0)
+        margin = z * math.sqrt(self.variance() / self.count)
+        return (self.mean - margin, self.mean + margin)
+
+    def snapshot(self, z=1.96):
+        return {
+            "games": self.count,
+            "mean": self.mean,
+            "stdev": self.stdev(),
+            "ci": list(self.confidence_interval(z)),
+            "min": self.low,
+            "max": self.high,
+        }
+
+
+class SessionStats:
+    def __init__(self):
+        self.overall = RunningStats()
+        self.by_category = [RunningStats() for _ in range(STRAIGHT_FLUSH + 1)]
+        self.by_fold_round = [RunningStats() for _ in range(5)]
+
+    def add(self, score, player_value, folded_round=0):
+        self.overall.add(score)
+        self.by_category[player_value >> CATEGORY_SHIFT].add(score)
+        self.by_fold_round[folded_round].add(score)
+
+    def add_result(self, result):
+        # result is a poker_engine.GameResult
+        self.add(result.score, result.player_value, result.folded_round)
+
+    def merge(self, other):
+        self.overall.merge(other.overall)
+        for mine, theirs in zip(self.by_category, other.by_category):
+            mine.merge(theirs)
+        for mine, theirs in zip(self.by_fold_round, other.by_fold_round):
+            mine.merge(theirs)
+        return self
+
+    def snapshot(self, z=1.96):
+        return {
+            "overall": self.overall.snapshot(z),
+            "by_category": {HAND_RANKINGS[STRAIGHT_FLUSH - cat]: column.snapshot(z)
+                            for cat, column in enumerate(self.by_category) if column.count},
+            "by_fold_round": {str(rnd): column.snapshot(z)
+                              for rnd, column in enumerate(self.by_fold_round) if column.count},
+        }
+
+    def save(self, path, z=1.96):
+        with open(path, "w") as file:
+            json.dump(self.snapshot(z), file, indent=2)
+
+
+def _run_chunk(strategy, games, seed):
+    stats = SessionStats()
+    for result in PokerEngine(strategy, seed=seed).run(games):
+        stats.add_result(result)
+    return stats
+
+
+def simulate(strategy=always_stay, games=100000, workers=None, seed=0, chunk=100000):
+    """Plays games headless across worker processes and merges their stats
+    in chunk order. strategy must be picklable (a module-level function)."""
+    jobs = []
+    for index, start in enumerate(range(0, games, chunk)):
+        jobs.append((strategy, min(chunk, games - start), f"{seed}:{index}"))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    stats = SessionStats()
+    if min(workers, len(jobs)) <= 1:
+        for job in jobs:
+            stats.merge(_run_chunk(*job))
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_run_chunk, *zip(*jobs)):
+            stats.merge(part)
+    return stats
@@ -1,13 +1,20 @@
-import random
+import os
 import sys
-from collections import Counter, defaultdict
+import time
 from graphics import *
+from poker_eval import HAND_RANKINGS, CARD_INDEX, CARD_NAMES, HandValue, hand_value
+from poker_engine import FastDeck, PokerEngine, always_stay
+from poker_log import GameRecorder
+from poker_stats import SessionStats
+import poker_profile
 
 
 class Card:
     Ranks = list("23456789TJQKA")
     Suits = list("HDCS")
     Suitsymbol = {"C": chr(9827), "D" : chr(9830), "H" : chr(9829), "S": chr(9824)}
+    # code is the card's int in poker_eval, so engines never need the object
+    __slots__ = ("rank", "suit", "code", "face_up", "height", "width", "rect", "text")
 
     def __init__(self, rank, suit):
         if not (rank in Card.Ranks) or not (suit in Card.Suits):
@@ -15,6 +22,7 @@ class Card:
         else:
             self.rank = rank
             self.suit = suit
+            self.code = CARD_INDEX[rank + suit]
             self.face_up = False
         
     def __str__(self):
@@ -52,6 +60,14 @@ class Card:
     def getSuit(self):
         return self.suit
 
+    @staticmethod
+    def from_code(code):
+        # Shared instance, no allocation
+        return CARDS[code]
+
+# One Card per int code, for converting engine results back to objects
+CARDS = [Card(name[0], name[1]) for name in CARD_NAMES]
+
 class Button:
 
     """A button is a labeled rectangle in a window.
@@ -107,40 +123,61 @@ class Button:
         self.rect.setWidth(1)
         self.active = False
 
+class CardSlot:
+
+    """A fixed spot on the table that shows one card. Its rectangle and
+    label are created and drawn once; show() reconfigures them in place,
+    and only the properties that actually change."""
+
+    height = 2
+    width = 0.6 * height
+
+    def __init__(self, win, pt):
+        self.rect = Rectangle(pt, Point(pt.getX() + self.width, pt.getY() + self.height))
+        self.rect.setFill('gray')
+        self.rect.draw(win)
+        self.text = Text(self.rect.getCenter(), "")
+        self.text.setSize(20)
+        self.text.draw(win)
+        self.fill = 'gray'
+        self.label = ""
+        self.color = "black"
+
+    def show(self, card, face_up):
+        if face_up:
+            fill = 'white'
+            label = card.rank + Card.Suitsymbol[card.suit]
+            color = "red" if card.suit == "H" or card.suit == "D" else "black"
+        else:
+            fill, label, color = 'gray', "", self.color
+        if fill != self.fill:
+            self.rect.setFill(fill)
+            self.fill = fill
+        if label != self.label:
+            self.text.setText(label)
+            self.label = label
+        if color != self.color:
+            self.text.setTextColor(color)
+            self.color = color
+
 class Deck:
-    def __init__(self):
-        self.cards = []
-        self.create_deck()
-        
-    def create_deck(self):
-        for suit in Card.Suits:
-            for rank in Card.Ranks:
-                self.cards.append(Card(rank, suit))
+    # Backed by FastDeck: the 52 shared CARDS are never rebuilt, dealing
+    # shuffles lazily and a new game only rewinds the deck.
+    def __init__(self, rng=None):
+        self.fast = FastDeck(rng)
     
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.fast.reset()
     
     def deal(self):
-        if len(self.cards) == 0:
-            raise ValueError("No more cards in the deck.")
-        return self.cards.pop()
+        return CARDS[self.fast.deal()]
     
     def __len__(self):
-        return len(self.cards)
+        return len(self.fast)
 
 
 class PokerHand:
-    hand_rankings = [
-        "Straight Flush",
-        "Four of a Kind",
-        "Full House",
-        "Flush",
-        "Straight",
-        "Three of a Kind",
-        "Two Pair",
-        "One Pair",
-        "High Card"
-    ] 
+    hand_rankings = HAND_RANKINGS
     def __init__(self):
         self.cards = []
 
@@ -148,103 +185,22 @@ class PokerHand:
         self.cards.append(card)
 
     def check_hand(self, table_cards):
-        all_cards = self.cards + table_cards
-        ranks = [card.rank for card in all_cards]
-        suits = [card.suit for card in all_cards]
-
-        # Check from highest rank to lowest
-        if self.check_straight_flush(suits, ranks):
-            return "Straight Flush"
-        elif self.check_four_kind(ranks):
-            return "Four of a Kind"
-        elif self.check_full_house(ranks):
-            return "Full House"
-        elif self.check_flush(suits):
-            return "Flush"
-        elif self.check_straight(ranks):
-            return "Straight"
-        elif self.check_three_kind(ranks):
-            return "Three of a Kind"
-        elif self.check_two_pairs(ranks):
-            return "Two Pair"
-        elif self.check_one_pair(ranks):
-            return "One Pair"
-        else:
-            return "High Card"
-    
-    def check_straight_flush(self, suits, ranks):
-        # Get all suits and ranks
-        all_suits = ['H', 'D', 'C', 'S']
-        all_ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-
-        # Check each suit
-        for suit in all_suits:
-            # Get ranks of cards with this suit
-            suited_ranks = [rank for rank, s in zip(ranks, suits) if s == suit]
+        return self.hand_value(table_cards).name
 
-            if self.check_straight(suited_ranks):
-              return True
-
-        return False
-
-        
-    def check_straight(self, ranks):
-        if (len(ranks)) < 5:
-            return False
-        all_ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-        rank_indicies = sorted(set(all_ranks.index(rank) for rank in ranks))
-        for i in range(len(rank_indicies) - 4):
-          start = rank_indicies[i]
-          if rank_indicies[i:i+5] == [start, start+1, start+2, start+3, start+4]:
-            return True 
-
-        return False
-
-    def check_four_kind(self, ranks):
-        rank_count = Counter(ranks)
-        return 4 in rank_count.values()
-
-    def check_three_kind(self, ranks):
-        rank_count = Counter(ranks)
-        return 3 in rank_count.values()
-
-    def check_full_house(self, ranks):
-        rank_count = Counter(ranks)
-        return 2 in rank_count.values() and 3 in rank_count.values()
-
-    def check_flush(self, suits):
-        suit_count = Counter(suits)
-        return 5 in suit_count.values()
-
-    def check_two_pairs(self, ranks):
-        rank_count = Counter(ranks)
-        return list(rank_count.values()).count(2) >= 2
-
-    def check_one_pair(self, ranks):
-        rank_count = Counter(ranks)
-        return 2 in rank_count.values()
-        
-    def get_pair_rank(self, table_cards):
-        rank_count = Counter([card.rank for card in self.cards + table_cards])
-        pairs = [rank for rank, count in rank_count.items() if count == 2]
-        if pairs:
-            all_ranks = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
-            pair_ranks = sorted(pairs, key=all_ranks.index)
-            return pair_ranks[0]
-
-    def get_high_card(self):
-        all_ranks = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
-        card_ranks = sorted([card.rank for card in self.cards], key=all_ranks.index)
-        return card_ranks[0]
+    def hand_value(self, table_cards):
+        # Comparable key (category, primary ranks, kickers) from poker_eval
+        return hand_value([card.code for card in self.cards + table_cards])
     
 class PokerGame:
-    def __init__(self):
-        self.deck = Deck()
-        self.deck.shuffle()
+    def __init__(self, log_path=None, autoflush=True):
+        # With log_path, every finished deal is appended to a poker_log file
+        self.recorder = GameRecorder(log_path) if log_path else None
+        # The engine owns the deck and the rules; this class only shows them
+        self.engine = PokerEngine()
+        self.state = None
         self.dealer_hole = PokerHand()
         self.player_hole = PokerHand()
         self.table_cards = []
-        self.betting_round = 1
         self.controls = {
             'STAY': self.stay,
             'FOLD': self.fold,
@@ -254,10 +210,13 @@ class PokerGame:
         self.results = {
             "average point" :0,
             "games_played": 0 }
+        self.stats = SessionStats()
+        # run() turns this off when a strategy plays, so a fast auto run
+        # doesn't spend its time printing every deal
+        self.verbose = True
         self.deal_initial_cards()
-        self.folded_round = 0
-        self.score = 0
-        self.win = GraphWin("Poker Solitaire", 600, 600)
+        # autoflush=False leaves redraws to the event loop's frame rate
+        self.win = GraphWin("Poker Solitaire", 600, 600, autoflush)
         self.win.setCoords(0, 0, 10, 10)
         self.controlText = Text(Point(8.5, 7.5), "CONTROLS")
         self.controlText.draw(self.win)
@@ -296,96 +255,74 @@ class PokerGame:
         self.deal_button = Button(self.win, Point(8, 9.5), 1, 0.8, 'DEAL')
         self.stay_button = Button(self.win, Point(8, 8.5), 1, 0.8, 'STAY')
         self.fold_button = Button(self.win, Point(9.3, 8.5), 1, 0.8, 'FOLD')
-        self.action = " "
+        # Card widgets are pooled: one slot per card position, reused every deal
+        self.dealer_slots = [CardSlot(self.win, Point(0.3 + i * 1.5, 7.8)) for i in range(2)]
+        self.player_slots = [CardSlot(self.win, Point(7 + i * 1.5, 1)) for i in range(2)]
+        self.table_slots = [CardSlot(self.win, Point(3 + i * 1.5, 4.5)) for i in range(3)]
+        self.table_slots.append(CardSlot(self.win, Point(4.5, 7)))
+        self.table_slots.append(CardSlot(self.win, Point(4.5, 2)))
         self.game_played = 1
         self.sum_point = 0
         self.stay_button.activate()
         self.fold_button.activate()
     
     def draw_player_cards(self):
-        x = 7
-        y = 1
-        for card in self.player_hole.cards:
-            card.draw_face_up(self.win, Point(x, y))
-            x += 1.5
+        for slot, card in zip(self.player_slots, self.player_hole.cards):
+            slot.show(card, True)
     def draw_dealer_cards(self, face_up=False):
-        x = 0.3
-        y = 7.8
-        for card in self.dealer_hole.cards:
-            if face_up:
-                card.draw_face_up(self.win, Point(x, y))
-            else:
-                card.draw_face_down(self.win, Point(x, y))
-            x += 1.5
+        for slot, card in zip(self.dealer_slots, self.dealer_hole.cards):
+            slot.show(card, face_up)
     
     def draw_table_cards(self,face_down=True):
-        x = 3
-        y = 4.5
-        for i, card in enumerate(self.table_cards[0:3]):
-            if face_down:
-                card.draw_face_down(self.win, Point(x + i * 1.5, y))
-            else:
-                card.draw_face_up(self.win, Point(x + i * 1.5, y))
-        if face_down:
-            self.table_cards[3].draw_face_down(self.win, Point(4.5, 7))
-        else:
-            self.table_cards[3].draw_face_up(self.win, Point(4.5, 7))
-        if face_down:
-            self.table_cards[4].draw_face_down(self.win, Point(4.5, 2))
-        else:
-            self.table_cards[4].draw_face_up(self.win, Point(4.5, 2))
+        for slot, card in zip(self.table_slots, self.table_cards):
+            slot.show(card, not face_down)
     def reveal_first_three_table_cards(self):
-        x = 3
-        y = 4.5
-        for i, card in enumerate(self.table_cards[0:3]):
-                card.draw_face_up(self.win, Point(x + i * 1.5, y))
+        for slot, card in zip(self.table_slots[0:3], self.table_cards[0:3]):
+                slot.show(card, True)
     def reveal_fourth_card(self):
-        self.table_cards[3].draw_face_up(self.win, Point(4.5, 7))
+        self.table_slots[3].show(self.table_cards[3], True)
     def reveal_fifth_card(self):
-        self.table_cards[4].draw_face_up(self.win, Point(4.5, 2))
+        self.table_slots[4].show(self.table_cards[4], True)
+
+    @property
+    def betting_round(self):
+        # 0 once the deal is over
+        return self.state.betting_round
 
     def deal_initial_cards(self):
-        for _ in range(2):
-            self.dealer_hole.add_card(self.deck.deal())
-            self.player_hole.add_card(self.deck.deal())
-        for _ in range(5):
-            self.table_cards.append(self.deck.deal())
+        # Each deal gets its own seed, so a logged game can be dealt again
+        self.state = self.engine.new_game(self.engine.next_seed())
+        self.dealer_hole.cards = [CARDS[c] for c in self.state.dealer_hole]
+        self.player_hole.cards = [CARDS[c] for c in self.state.player_hole]
+        self.table_cards = [CARDS[c] for c in self.state.table_cards]
         
     def stay(self):
-        self.action += "S/"
-        if self.betting_round == 1:
+        betting_round = self.state.betting_round
+        result = self.state.act("STAY")
+        if result is not None:
+            self.finish_deal(result)
+            return
+        if betting_round == 1:
             self.reveal_first_three_table_cards()
-            """self.next_betting_round()"""
-        elif self.betting_round == 2:
+        elif betting_round == 2:
             self.reveal_fourth_card()
-            """self.next_betting_round()"""
-        elif self.betting_round == 3:
+        elif betting_round == 3:
             self.reveal_fifth_card()
-            """self.next_betting_round()"""
-        elif self.betting_round == 4:
-            self.sum_point += self.evaluate_and_results()
-            print("Dealer's hole:",[f'{card.rank}{card.suit}' for card in self.dealer_hole.cards])
-            self.draw_dealer_cards(True)
-            self.deal_button.activate()
-            self.quit_button.activate()
-            self.stay_button.deactivate()
-            self.fold_button.deactivate()
-            self.results_text_winner.draw(self.win)
-            self.results_text_loser.draw(self.win)
-            self.results_text_action.draw(self.win)
-            self.results_text_score.draw(self.win)
-            self.results_text_average.draw(self.win)
-        self.next_betting_round()
+        self.stay_button.activate()
+        self.fold_button.activate()
 
     def fold(self):
-        print("Dealer's hole:",[f'{card.rank}{card.suit}' for card in self.dealer_hole.cards])
+        self.finish_deal(self.state.act("FOLD"))
+
+    def finish_deal(self, result):
+        self.say("Dealer's hole:",[f'{card.rank}{card.suit}' for card in self.dealer_hole.cards])
         self.draw_dealer_cards(True)
-        self.draw_table_cards(False)
-        self.folded_round = self.betting_round
-        print("Table cards:", [f'{card.rank}{card.suit}' for card in self.table_cards])
-        self.action += "F"
-        self.score = self.evaluate_and_results()
-        self.sum_point += self.evaluate_and_results()
+        if result.folded_round:
+            self.draw_table_cards(False)
+            self.say("Table cards:", [f'{card.rank}{card.suit}' for card in self.table_cards])
+        self.sum_point += result.score
+        self.evaluate_and_results(result)
+        self.record_deal(result)
         self.results_text_winner.draw(self.win)
         self.results_text_loser.draw(self.win)
         self.results_text_action.draw(self.win)
@@ -395,115 +332,63 @@ class PokerGame:
         self.quit_button.activate()
         self.stay_button.deactivate()
         self.fold_button.deactivate()
-        self.betting_round = 0
-        
-    def deal_table_cards(self, n):
-        for _ in range(n):
-            self.table_cards.append(self.deck.deal())
     
+    def say(self, *args):
+        if self.verbose:
+            print(*args)
+
     def print_game(self):
         print("Round:", self.betting_round)
         print("Dealer's hole:",[f'{card.rank}{card.suit}' for card in self.dealer_hole.cards])
         print("Player's hole:", [f'{card.rank}{card.suit}' for card in self.player_hole.cards])
         print("Table cards:", [f'{card.rank}{card.suit}' for card in self.table_cards])
         
+    def record_deal(self, result):
+        self.stats.add_result(result)
+        self.results["games_played"] = self.stats.overall.count
+        self.results["average point"] = self.stats.overall.mean
+        if self.recorder:
+            self.recorder.write_result(result)
+
     def quit(self):
         print("Quitting the game.")
+        if self.recorder:
+            self.recorder.close()
         sys.exit()
 
-    def next_betting_round(self):
-        self.betting_round += 1
-        if self.betting_round <=4:
-            self.stay_button.activate()
-            self.fold_button.activate()
-        if self.betting_round > 4:
-            self.betting_round = 0
-            self.results['games_played'] += 1
-            self.evaluate_and_results()
-    
-    def evaluate_and_results(self):
-        all_ranks = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
-        Dealer_result = self.dealer_hole.check_hand(self.table_cards)
-        Player_result = self.player_hole.check_hand(self.table_cards)
-        print("Dealer's hole: ", Dealer_result)
-        print("Player's hole: ", Player_result)
-        if Dealer_result == Player_result:
-            if Dealer_result == "One Pair":
-                dealer_pair_rank = self.dealer_hole.get_pair_rank(self.table_cards)
-                player_pair_rank = self.player_hole.get_pair_rank(self.table_cards)
-                dealer_pair_rank_index = all_ranks.index(dealer_pair_rank)
-                player_pair_rank_index = all_ranks.index(player_pair_rank)
-                if dealer_pair_rank and player_pair_rank and dealer_pair_rank_index < player_pair_rank_index :
-                    print("Dealer wins!")
-                    self.results_text_winner.setText(f"√Dealer: {Dealer_result}")
-                    self.results_text_loser.setText(f"Player: {Player_result}")
-                    game_points = -100
-                elif dealer_pair_rank and player_pair_rank and dealer_pair_rank_index == player_pair_rank_index:
-                    self.results_text_winner.setText(f"It's a draw")
-                    game_points = 0
-                else:
-                    self.results_text_winner.setText(f"√Player: {Player_result}")
-                    self.results_text_loser.setText(f"Dealer: {Dealer_result}")
-                    game_points = 100
-            elif Dealer_result == "High Card":
-                dealer_high_card = self.dealer_hole.get_high_card()
-                player_high_card = self.player_hole.get_high_card()
-                dealer_high_card_index = all_ranks.index(dealer_high_card)
-                player_high_card_index = all_ranks.index(player_high_card) 
-                if dealer_high_card and player_high_card and dealer_high_card_index < player_high_card_index:
-                    print("Dealer wins!")
-                    self.results_text_winner.setText(f"√Dealer: {Dealer_result}")
-                    self.results_text_loser.setText(f"Player: {Player_result}")
-                    game_points = -100
-                elif dealer_high_card and player_high_card and dealer_high_card_index == player_high_card_index:
-                    self.results_text_winner.setText(f"It's a draw")
-                    game_points = 0
-                else:
-                    print("Player wins!")
-                    self.results_text_winner.setText(f"√Player: {Player_result}")
-                    self.results_text_loser.setText(f"Dealer: {Dealer_result}")
-                    game_points = 100
-            else:
-                self.results_text_winner.setText("It's a draw")
-                self.results_text_loser.setText("")
-                print("It's a draw!")
-                game_points = 0
+    def evaluate_and_results(self, result):
+        # Shows a finished deal's GameResult; the engine already scored it
+        dealer_value = HandValue(result.dealer_value)
+        player_value = HandValue(result.player_value)
+        Dealer_result = dealer_value.name
+        Player_result = player_value.name
+        self.say("Dealer's hole: ", Dealer_result)
+        self.say("Player's hole: ", Player_result)
+        # Values already hold category and kickers, so one comparison decides
+        if dealer_value == player_value:
+            self.results_text_winner.setText("It's a draw")
+            self.results_text_loser.setText("")
+            self.say("It's a draw!")
+        elif dealer_value > player_value:
+            self.say("Dealer wins!")
+            self.results_text_winner.setText(f"√Dealer: {Dealer_result}")
+            self.results_text_loser.setText(f"Player: {Player_result}")
         else:
-            if PokerHand.hand_rankings.index(Dealer_result) < PokerHand.hand_rankings.index(Player_result):
-                print("Dealer wins!")
-                self.results_text_winner.setText(f"√Dealer: {Dealer_result}")
-                self.results_text_loser.setText(f"Player: {Player_result}")
-                game_points = -100
-            else:
-                print("Player wins!")
-                self.results_text_winner.setText(f"√Player: {Player_result}")
-                self.results_text_loser.setText(f"Dealer: {Dealer_result}")
-                game_points = 100
+            self.say("Player wins!")
+            self.results_text_winner.setText(f"√Player: {Player_result}")
+            self.results_text_loser.setText(f"Dealer: {Dealer_result}")
         
-        self.results_text_action.setText(f"Action: {self.action}")
+        self.results_text_action.setText(f"Action: {result.action}")
         
-        if self.folded_round:
-            fold_points = 100 - (self.folded_round - 1) * 25
-            if game_points < 0: 
-                game_points = fold_points
-            elif game_points > 0:  
-                game_points = -fold_points
-
-        print(f"Score for this round: {game_points}")
+        game_points = result.score
+
+        self.say(f"Score for this round: {game_points}")
         self.results_text_score.setText(f'Score for this round: {game_points}')
         self.results_text_average.setText(f'AVG: {round(self.sum_point/self.game_played, 1)} out of {self.game_played}')
         return game_points
 
     def reset_game(self):
-        self.dealer_hole = PokerHand()
-        self.player_hole = PokerHand()
-        self.table_cards = []
-        self.deck = Deck()
-        self.deck.shuffle()
-        self.betting_round = 1
-        self.folded_round = 0
         self.deal_initial_cards()
-        self.action = " "
         self.game_played += 1
         self.results_text_winner.undraw()
         self.results_text_loser.undraw()
@@ -519,33 +404,94 @@ class PokerGame:
         self.draw_table_cards(True)
     
     def handle_button_click(self):
-        click_point = self.win.getMouse()
-        # Get the mouse click point
+        # Blocking: waits for the next mouse click
+        self.handle_click(self.win.getMouse())
 
+    def handle_click(self, click_point):
     # Check if each button was clicked and perform the appropriate action
         if self.stay_button.clicked(click_point):
             self.stay()
         elif self.fold_button.clicked(click_point):
             self.fold()
         elif self.deal_button.clicked(click_point):
-            self.stay_button.deactivate()
-            self.fold_button.deactivate()
-            self.reset_game()
+            self.new_deal()
         elif self.quit_button.clicked(click_point):
             self.quit()
 
+    def new_deal(self):
+        self.stay_button.deactivate()
+        self.fold_button.deactivate()
+        self.reset_game()
+
+    def auto_step(self, strategy):
+        # One button press on behalf of a poker_engine-style strategy
+        if self.betting_round == 0:
+            self.new_deal()
+            return
+        state = self.state
+        action = strategy(state.player_hole, state.shown(), state.betting_round)
+        if action == "FOLD":
+            self.fold()
+        else:
+            self.stay()
+
+    def run(self, strategy=None, actions_per_second=10, fps=30, verbose=None):
+        """Event loop that polls the mouse once per frame instead of
+        blocking on it. With a strategy it also plays by itself, at
+        actions_per_second (None = as many as fit in each frame), while
+        the window is only redrawn fps times a second."""
+        if actions_per_second is not None and actions_per_second <= 0:
+            raise ValueError("actions_per_second must be positive.")
+        if verbose is None:
+            verbose = strategy is None
+        self.verbose = verbose
+        frame = 1.0 / fps
+        next_action = time.perf_counter()
+        shown_state = None
+        while not self.win.isClosed():
+            start = time.perf_counter()
+            # checkMouse also lets Tk process events and redraw the canvas
+            click_point = self.win.checkMouse()
+            if click_point:
+                self.handle_click(click_point)
+            if strategy and actions_per_second is None:
+                while time.perf_counter() - start < frame:
+                    self.auto_step(strategy)
+            elif strategy:
+                if next_action < start - frame:
+                    next_action = start  # fell behind; don't replay a backlog
+                while next_action <= start:
+                    self.auto_step(strategy)
+                    next_action += 1.0 / actions_per_second
+            state = (self.game_played, self.betting_round)
+            if verbose and state != shown_state and self.betting_round != 0:
+                self.print_game()
+            shown_state = state
+            time.sleep(max(0.0, start + frame - time.perf_counter()))
+
 def main():
-    game = PokerGame()
-    game.draw_player_cards()
-    game.draw_dealer_cards()
-    game.draw_table_cards()
-    
-    while True:
-        if game.betting_round != 0:
-            print("Round:", game.betting_round)
-            print("Dealer's hole:",[f'{card.rank}{card.suit}' for card in game.dealer_hole.cards])
-            print("Player's hole:", [f'{card.rank}{card.suit}' for card in game.player_hole.cards])
-            print("Table cards:", [f'{card.rank}{card.suit}' for card in game.table_cards])
-        game.handle_button_click()
+    # python pokergame3.py [auto [actions_per_second]]
+    # POKER_PROFILE=stats.json times the hot paths and writes them at exit
+    # POKER_LOG=games.plog appends every finished deal to a poker_log file
+    if os.environ.get("POKER_PROFILE"):
+        poker_profile.install(sys.modules[__name__], os.environ["POKER_PROFILE"])
+    auto = len(sys.argv) > 1 and sys.argv[1] == "auto"
+    rate = float(sys.argv[2]) if auto and len(sys.argv) > 2 else 10
+    if rate <= 0:
+        sys.exit("actions_per_second must be positive")
+    game = PokerGame(log_path=os.environ.get("POKER_LOG"), autoflush=not auto)
+    try:
+        game.draw_player_cards()
+        game.draw_dealer_cards()
+        game.draw_table_cards()
+        if auto:
+            game.run(always_stay, actions_per_second=rate)
+        else:
+            game.run()
+    finally:
+        # Closing the window ends run() without quit(); flush the log's
+        # buffered tail here rather than leave it to interpreter shutdown
+        if game.recorder:
+            game.recorder.close()
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
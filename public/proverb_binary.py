@@ -0,0 +1,220 @@
+import functools
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from proverb_corpus import ProverbCorpus, _text_signature
+from proverb_record import build_word_indicies, make_record
+from proverb_sampler import DedupedCorpus
+
+# Pre-tokenized corpus for guess_proverb, compiled offline from proverbs.txt
+# into one file (arrays in machine byte order, like proverb_corpus's index):
+#
+#   header        magic, version, source size and mtime_ns, proverb count,
+#                 word count (all proverbs), vocabulary size, text and
+#                 vocabulary blob sizes
+#   text_offsets  uint64[proverbs + 1]  byte offsets into the text blob
+#   word_offsets  uint32[proverbs + 1]  each proverb's first entry in the
+#                                       two word arrays below
+#   word_starts   uint32[words]         character index of each word
+#   word_ids      uint32[words]         vocabulary ID of each word
+#   vocab_offsets uint64[vocab + 1]     byte offsets into the vocabulary blob
+#   text blob     UTF-8 proverbs, back to back
+#   vocab blob    UTF-8 lowercase words, sorted, so IDs can be looked up
+#                 by binary search
+#
+# Words are the tokens of build_word_indicies, so a round built from the
+# file is the same as one built from the text. The file is mapped read-only
+# and every section is a memoryview cast over the mapping: opening it reads
+# only the header, and processes opening the same file share its pages.
+
+SUFFIX = ".pvb"
+MAGIC = b"PRVB"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQQQQQQ")
+ALIGN = 8
+RECORD_CACHE = 4096  # records kept per open corpus, like compile_proverb's cache
+
+
+def binary_path(text_path):
+    return os.path.splitext(text_path)[0] + SUFFIX
+
+
+def _padded(size):
+    return -size % ALIGN
+
+
+def compile_binary(text_path, out_path=None):
+    """Tokenizes every distinct proverb of text_path once and writes the
+    binary corpus; returns its path."""
+    out_path = out_path or binary_path(text_path)
+    size, mtime_ns = _text_signature(text_path)
+    corpus = DedupedCorpus(ProverbCorpus(text_path))
+    text = bytearray()
+    text_offsets = array("Q", [0])
+    word_offsets = array("I", [0])
+    word_starts = array("I")
+    words = []
+    vocab = {}
+    try:
+        for i in range(len(corpus)):
+            proverb = corpus[i]
+            text += proverb.encode("utf-8")
+            text_offsets.append(len(text))
+            indicies = build_word_indicies(proverb)
+            for start, word in sorted((start, word) for word, starts in indicies.items()
+                                      if word for start in starts):
+                word_starts.append(start)
+                words.append(vocab.setdefault(word, len(vocab)))
+            word_offsets.append(len(word_starts))
+    finally:
+        corpus.close()
+
+    # Renumber the vocabulary in sorted order
+    ordered = sorted(vocab, key=lambda word: word.encode("utf-8"))
+    new_id = array("I", bytes(4 * len(ordered)))
+    vocab_blob = bytearray()
+    vocab_offsets = array("Q", [0])
+    for word_id, word in enumerate(ordered):
+        new_id[vocab[word]] = word_id
+        vocab_blob += word.encode("utf-8")
+        vocab_offsets.append(len(vocab_blob))
+    word_ids = array("I", (new_id[word] for word in words))
+
+    sections = [text_offsets, word_offsets, word_starts, word_ids, vocab_offsets,
+                bytes(text), bytes(vocab_blob)]
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size, mtime_ns, len(text_offsets) - 1,
+                               len(word_starts), len(ordered), len(text), len(vocab_blob)))
+        for section in sections:
+            data = section.tobytes() if isinstance(section, array) else section
+            file.write(data)
+            file.write(bytes(_padded(len(data))))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def is_current(text_path, path=None):
+    """True when the binary corpus exists and was compiled from the
+    text as it is now (or the text is gone)."""
+    path = path or binary_path(text_path)
+    try:
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+    except OSError:
+        return False
+    if len(header) < HEADER.size:
+        return False
+    magic, version, size, mtime_ns = HEADER.unpack(header)[:4]
+    if (magic, version) != (MAGIC, VERSION):
+        return False
+    try:
+        return (size, mtime_ns) == _text_signature(text_path)
+    except OSError:
+        return True
+
+
+class BinaryCorpus:
+    """Sequence of proverbs over a compiled file, like ProverbCorpus, plus
+    record(i): the ProverbRecord of proverb i built from the stored words
+    instead of re-tokenizing its text, with the most recent ones cached."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = HEADER.unpack_from(self.map)
+        if fields[:2] != (MAGIC, VERSION):
+            self.map.close()
+            raise ValueError("Not a compiled proverb corpus: " + path)
+        count, words, vocab, text_size, vocab_size = fields[4:]
+        view = memoryview(self.map)
+        offset = HEADER.size
+        self.views = [view]
+
+        def section(length, fmt=None):
+            nonlocal offset
+            size = length * struct.calcsize(fmt) if fmt else length
+            part = view[offset:offset + size]
+            offset += size + _padded(size)
+            self.views.append(part)
+            if fmt:
+                part = part.cast(fmt)
+                self.views.append(part)
+            return part
+
+        self.text_offsets = section(count + 1, "Q")
+        self.word_offsets = section(count + 1, "I")
+        self.word_starts = section(words, "I")
+        self.word_ids = section(words, "I")
+        self.vocab_offsets = section(vocab + 1, "Q")
+        self.text = section(text_size)
+        self.vocab = section(vocab_size)
+        self.words = {}
+        self.record = functools.lru_cache(maxsize=RECORD_CACHE)(self._record)
+
+    def __len__(self):
+        return len(self.text_offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("proverb index out of range")
+        return str(self.text[self.text_offsets[i]:self.text_offsets[i + 1]], "utf-8")
+
+    def random_proverb(self, rng=random):
+        return self[rng.randrange(len(self))]
+
+    def word(self, word_id):
+        word = self.words.get(word_id)
+        if word is None:
+            start, end = self.vocab_offsets[word_id], self.vocab_offsets[word_id + 1]
+            word = self.words[word_id] = sys.intern(str(self.vocab[start:end], "utf-8"))
+        return word
+
+    def word_id(self, word):
+        """Vocabulary ID of a lowercase word, or None."""
+        key = word.encode("utf-8")
+        lo, hi = 0, len(self.vocab_offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self.vocab[self.vocab_offsets[mid]:self.vocab_offsets[mid + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.vocab_offsets) - 1 and \
+                self.vocab[self.vocab_offsets[lo]:self.vocab_offsets[lo + 1]] == key:
+            return lo
+        return None
+
+    def word_spans(self, i):
+        """(start, word ID) of each word of proverb i, in order."""
+        first, last = self.word_offsets[i], self.word_offsets[i + 1]
+        return zip(self.word_starts[first:last], self.word_ids[first:last])
+
+    def indicies(self, i):
+        """build_word_indicies(self[i]) without the empty-word entry."""
+        indicies = {}
+        for start, word_id in self.word_spans(i):
+            indicies.setdefault(self.word(word_id), []).append(start)
+        return indicies
+
+    def _record(self, i):
+        return make_record(self[i], self.indicies(i))
+
+    def close(self):
+        for part in reversed(self.views):
+            part.release()
+        self.views = []
+        self.record.cache_clear()
+        self.map.close()
+
+
+if __name__ == "__main__":
+    text_path = sys.argv[1] if len(sys.argv) > 1 else "proverbs.txt"
+    out_path = compile_binary(text_path, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Compiled {text_path} to {out_path}")
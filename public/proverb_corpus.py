@@ -0,0 +1,146 @@
+import mmap
+import os
+import random
+import struct
+from array import array
+from proverb_sampler import _table_size
+
+# Line-offset index over a proverbs file, so a multi-million-line corpus is
+# never read into a list. The index holds the uint64 start offset of every
+# non-blank line, so corpus[i] is the i-th non-blank line, followed by the
+# uint32 positions of the distinct ones (each repeated line's first copy).
+# It is saved next to the text as <file>.idx and rebuilt only when the
+# text's size or modification time changes, so repeats are found once, not
+# on every open; proverb_sampler.DedupedCorpus reads the stored positions.
+# Both files are memory-mapped; picking a proverb touches one offset and
+# one line.
+
+INDEX_SUFFIX = ".idx"
+MAGIC = b"PRIX"
+VERSION = 3
+# magic, version, text size, text mtime_ns, number of non-blank lines
+HEADER = struct.Struct("<4sIQQQ")
+
+
+def _text_signature(path):
+    info = os.stat(path)
+    return info.st_size, info.st_mtime_ns
+
+
+def build_index(path, index_path=None):
+    """Scans the text once and writes the offsets of its non-blank lines
+    and the positions of the distinct ones. Lines are hashed into an
+    open-addressing table, as in proverb_sampler.DedupedCorpus, with the
+    position + 1 of each distinct line in its slot; a hash match is
+    checked against the text."""
+    index_path = index_path or path + INDEX_SUFFIX
+    size, mtime_ns = _text_signature(path)
+    offsets = array("Q")
+    distinct = array("I")
+    if size:
+        with open(path, "rb") as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as text:
+            mask = _table_size(_count_lines(text)) - 1
+            tags = array("I", [0]) * (mask + 1)
+            slots = array("I", [0]) * (mask + 1)
+            start = 0
+            while start < size:
+                end = text.find(b"\n", start)
+                if end == -1:
+                    end = size
+                line_start, start = start, end + 1
+                line = text[line_start:end].strip()
+                if not line:
+                    continue
+                offsets.append(line_start)
+                h = hash(line)
+                tag = (h >> 32) & 0xFFFFFFFF
+                slot = h & mask
+                while slots[slot]:
+                    if tags[slot] == tag and _line_at(text, offsets[slots[slot] - 1]) == line:
+                        break
+                    slot = (slot + 1) & mask
+                else:
+                    tags[slot] = tag
+                    slots[slot] = len(offsets)
+                    distinct.append(len(offsets) - 1)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size, mtime_ns, len(offsets)))
+        offsets.tofile(file)
+        distinct.tofile(file)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def _count_lines(text, block=1 << 20):
+    lines = 1
+    for start in range(0, len(text), block):
+        lines += text[start:start + block].count(b"\n")
+    return lines
+
+
+def _line_at(text, start):
+    end = text.find(b"\n", start)
+    return text[start:end if end != -1 else len(text)].strip()
+
+
+def _index_is_current(path, index_path):
+    try:
+        with open(index_path, "rb") as file:
+            header = file.read(HEADER.size)
+    except OSError:
+        return False
+    if len(header) < HEADER.size:
+        return False
+    magic, version, size, mtime_ns = HEADER.unpack(header)[:4]
+    return (magic, version) == (MAGIC, VERSION) and (size, mtime_ns) == _text_signature(path)
+
+
+class ProverbCorpus:
+    """Sequence-like view of a proverbs file: len(corpus), corpus[i] and
+    random.choice(corpus) all work without loading the text. Positions
+    count non-blank lines, repeats included; distinct holds the positions
+    of the first copy of each line."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        if not _index_is_current(path, self.index_path):
+            build_index(path, self.index_path)
+        self.text = self._map(path)
+        self.index = self._map(self.index_path)
+        count = HEADER.unpack_from(self.index)[4]
+        view = memoryview(self.index)
+        self.offsets = view[HEADER.size:HEADER.size + 8 * count].cast("Q")
+        self.distinct = view[HEADER.size + 8 * count:].cast("I")
+        view.release()
+
+    @staticmethod
+    def _map(path):
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""  # mmap can't map an empty file
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.offsets)
+        start = self.offsets[i]  # raises IndexError when out of range
+        end = self.text.find(b"\n", start)
+        if end == -1:
+            end = len(self.text)
+        return self.text[start:end].decode("utf-8").strip()
+
+    def random_proverb(self, rng=random):
+        return self[rng.randrange(len(self))]
+
+    def close(self):
+        self.offsets.release()
+        self.distinct.release()
+        for mapped in (self.text, self.index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
@@ -0,0 +1,246 @@
+import argparse
+import collections
+import hashlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from proverb_corpus import ProverbCorpus
+from guess_proverb import ProverbSession
+
+# Bulk difficulty scoring: plays every proverb of a corpus with an automated
+# guesser under the real game rules (ProverbSession, i.e. the word index of
+# build_word_indicies and the reveal_char hints) and records, per proverb,
+# the wrong guesses and the letters the hints had to reveal.
+#
+# Results go to an append-only cache keyed by a hash of the proverb text,
+# flushed after every chunk, so an interrupted run picks up where it stopped
+# and re-scoring an edited corpus only plays the lines whose text changed.
+# The cache header names the guesser; a different guesser starts afresh.
+
+CHUNK_SIZE = 2000
+RESULTS_SUFFIX = ".scores"
+CACHE_HEADER = "#proverb-difficulty v1 "
+
+# Used when no word list is given, most frequent first
+COMMON_WORDS = [
+    "the", "a", "is", "of", "to", "and", "in", "you", "it", "not", "no", "be",
+    "as", "that", "for", "are", "he", "who", "all", "an", "never", "what",
+    "one", "man", "good", "than", "have", "with", "his", "does", "can", "do",
+    "time", "make", "makes", "like", "but", "if", "will", "there", "when",
+    "way", "your", "at", "by", "on", "best", "better", "from", "every",
+    "too", "many", "first", "before", "out", "gets", "get", "money", "eye",
+    "bird", "birds", "home", "words", "actions", "speak", "louder", "worm",
+    "early", "late", "cook", "cooks", "spoil", "broth", "rome", "day",
+]
+
+Score = collections.namedtuple(
+    "Score", ["wrong", "max_guess", "letters_revealed", "won"])
+
+_WORD = re.compile(r"[A-Za-z~']+")
+
+
+class FrequencyGuesser:
+    """Guesses the most frequent untried word that fits one of the still
+    masked words in the view, i.e. has its length and agrees with its
+    revealed letters. With nothing fitting it guesses the most frequent
+    untried word anyway. Words are ranked by their order in the list."""
+
+    def __init__(self, words, name=None):
+        self.words = list(dict.fromkeys(word.lower() for word in words if word))
+        self.by_length = collections.defaultdict(list)
+        for rank, word in enumerate(self.words):
+            self.by_length[len(word)].append((rank, word))
+        digest = hashlib.blake2b("\n".join(self.words).encode("utf-8"), digest_size=8)
+        self.name = name or f"frequency:{digest.hexdigest()}"
+
+    @classmethod
+    def from_file(cls, path):
+        """One word per line, most frequent first."""
+        with open(path, encoding="utf-8") as file:
+            return cls(line.strip() for line in file)
+
+    @staticmethod
+    def _fits(word, pattern):
+        for w, p in zip(word, pattern):
+            if p != "~" and p != w:
+                return False
+        return True
+
+    def __call__(self, view, tried):
+        best = None
+        for pattern in _WORD.findall(view.lower()):
+            if "~" not in pattern:
+                continue
+            for rank, word in self.by_length.get(len(pattern), ()):
+                if best is not None and rank >= best[0]:
+                    break
+                if word not in tried and self._fits(word, pattern):
+                    best = (rank, word)
+                    break
+        if best is not None:
+            return best[1]
+        for word in self.words:
+            if word not in tried:
+                return word
+        return None
+
+
+def play(proverb, guesser):
+    """One round of proverb with guesser(view, tried) -> word or None
+    making one guess per turn; None is the empty guess."""
+    session = ProverbSession(())
+    session.new_round(proverb)
+    tried = set()
+    letters_revealed = 0
+    while not session.finished:
+        word = guesser(session.view(), tried)
+        if word:
+            tried.add(word)
+        remaining = session.masked.remaining
+        result = session.guess(word or "")
+        if result.wrong:
+            letters_revealed += remaining - session.masked.remaining
+    return Score(session.wrong_guess, session.max_guess, letters_revealed, session.won())
+
+
+def proverb_key(proverb):
+    return hashlib.blake2b(proverb.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def sampling_weights(corpus, scores, easy=1.0):
+    """Weights for proverb_sampler.AliasSampler from a load_cache() result:
+    easy plus the share of guesses that were wrong, so harder proverbs come
+    up more often. Unscored proverbs get easy."""
+    for i in range(len(corpus)):
+        score = scores.get(proverb_key(corpus[i]))
+        if score is None or not score.max_guess:
+            yield easy
+        else:
+            yield easy + score.wrong / score.max_guess
+
+
+def load_cache(path, guesser_name):
+    """{proverb_key: Score} from a previous run with the same guesser."""
+    cache = {}
+    try:
+        file = open(path, encoding="utf-8")
+    except OSError:
+        return cache
+    with file:
+        if file.readline().rstrip("\n") != CACHE_HEADER + guesser_name:
+            return {}
+        for line in file:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 5 or not line.endswith("\n"):
+                continue  # torn tail of an interrupted run
+            key, wrong, max_guess, letters, won = fields
+            cache[key] = Score(int(wrong), int(max_guess), int(letters), won == "1")
+    return cache
+
+
+_worker = {}
+
+
+def _init_worker(path, guesser):
+    _worker["corpus"] = ProverbCorpus(path)
+    _worker["guesser"] = guesser
+
+
+def _score_chunk(indexes):
+    corpus, guesser = _worker["corpus"], _worker["guesser"]
+    return [(i, play(corpus[i], guesser)) for i in indexes]
+
+
+def score_corpus(path, guesser, results_path=None, workers=None, chunk=CHUNK_SIZE):
+    """Yields (index, proverb, Score) for every line of the corpus, where
+    index counts non-blank lines as ProverbCorpus does, playing only the
+    lines missing from the results cache, and repeated lines only once.
+    Cached lines come out first, the rest as their chunks finish."""
+    results_path = results_path or path + RESULTS_SUFFIX
+    cache = load_cache(results_path, guesser.name)
+    corpus = ProverbCorpus(path)
+    try:
+        todo = []
+        repeats = {}  # key of a queued line -> indexes of its later copies
+        for i in range(len(corpus)):
+            proverb = corpus[i]
+            key = proverb_key(proverb)
+            score = cache.get(key)
+            if score is not None:
+                yield i, proverb, score
+            elif key in repeats:
+                repeats[key].append(i)
+            else:
+                repeats[key] = []
+                todo.append(i)
+        jobs = [todo[start:start + chunk] for start in range(0, len(todo), chunk)]
+
+        mode = "a" if cache else "w"
+        with open(results_path, mode, encoding="utf-8") as out:
+            if mode == "w":
+                out.write(CACHE_HEADER + guesser.name + "\n")
+            if workers is None:
+                workers = os.cpu_count() or 1
+            if min(workers, len(jobs)) <= 1:
+                _init_worker(path, guesser)
+                parts = map(_score_chunk, jobs)
+                pool = None
+            else:
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(path, guesser))
+                parts = pool.map(_score_chunk, jobs)
+            try:
+                for part in parts:
+                    for i, score in part:
+                        proverb = corpus[i]
+                        key = proverb_key(proverb)
+                        out.write(f"{key}\t{score.wrong}\t{score.max_guess}"
+                                  f"\t{score.letters_revealed}\t{int(score.won)}\n")
+                        yield i, proverb, score
+                        for j in repeats.pop(key):
+                            yield j, proverb, score
+                    out.flush()
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+                _worker.clear()
+    finally:
+        corpus.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every proverb's difficulty")
+    parser.add_argument("corpus", nargs="?", default="proverbs.txt")
+    parser.add_argument("--words", metavar="PATH",
+                        help="word list for the guesser, most frequent first")
+    parser.add_argument("--results", metavar="PATH",
+                        help="score cache (default: <corpus>.scores)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--top", type=int, default=10,
+                        help="how many of the hardest proverbs to print")
+    args = parser.parse_args(argv)
+
+    guesser = FrequencyGuesser.from_file(args.words) if args.words else FrequencyGuesser(COMMON_WORDS)
+    scored = won = 0
+    hardest = []
+    for i, proverb, score in score_corpus(args.corpus, guesser, args.results,
+                                          args.workers, args.chunk):
+        scored += 1
+        won += score.won
+        ratio = score.wrong / score.max_guess if score.max_guess else 0.0
+        hardest.append((-ratio, -score.letters_revealed, i, proverb))
+        if len(hardest) > 4 * args.top:
+            hardest = sorted(hardest)[:args.top]
+    if not scored:
+        print("Proverbs file is empty.")
+        return 1
+    print(f"Scored {scored} proverbs, guesser won {won / scored * 100:.1f}%")
+    for ratio, letters, i, proverb in sorted(hardest)[:args.top]:
+        print(f"{i:>8} {-ratio:6.2f} {-letters:>4}  {proverb}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import asyncio
+import random
+import sys
+import time
+from proverb_corpus import ProverbCorpus
+from proverb_server import ProverbServer, ProverbClient, DEFAULT_HOST
+
+# Load test for proverb_server: starts a server in-process on a free port,
+# connects many stand-in clients at once and has each play a few rounds
+# guessing common words. Reports sessions per second and the latency of
+# single GUESS round trips.
+
+GUESS_WORDS = ["the", "a", "is", "of", "to", "and", "in", "you", "it", "not",
+               "no", "be", "man", "good", "time", "all", "never", "an", "who"]
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def play_session(port, rounds, rng, latencies):
+    client = await ProverbClient.connect(DEFAULT_HOST, port)
+    clock = time.perf_counter_ns
+    try:
+        for _ in range(rounds):
+            reply = await client.new_round()
+            while reply.startswith("ROUND"):
+                t0 = clock()
+                reply = await client.guess(rng.choice(GUESS_WORDS))
+                latencies.append(clock() - t0)
+    finally:
+        await client.close()
+
+
+async def load_test(path, clients=200, rounds=5, seed=0):
+    corpus = ProverbCorpus(path)
+    server = ProverbServer(corpus, seed)
+    port = await server.start(DEFAULT_HOST, 0)
+    rng = random.Random(seed)
+    latencies = []
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            play_session(port, rounds, random.Random(rng.random()), latencies)
+            for _ in range(clients)])
+        elapsed = time.perf_counter() - start
+    finally:
+        await server.close()
+        corpus.close()
+
+    latencies.sort()
+    return {
+        "sessions": clients,
+        "rounds": clients * rounds,
+        "guesses": len(latencies),
+        "seconds": elapsed,
+        "sessions_per_second": clients / elapsed,
+        "p50_us": _percentile(latencies, 0.50) / 1000 if latencies else 0.0,
+        "p99_us": _percentile(latencies, 0.99) / 1000 if latencies else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "proverbs.txt"
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    result = asyncio.run(load_test(path, clients, rounds))
+    print(f"{result['sessions']} sessions, {result['rounds']} rounds, "
+          f"{result['guesses']} guesses in {result['seconds']:.2f}s")
+    print(f"{result['sessions_per_second']:,.1f} sessions/s  "
+          f"guess p50 {result['p50_us']:,.0f} us  p99 {result['p99_us']:,.0f} us")
@@ -0,0 +1,48 @@
+import collections
+
+# Tokenizing a proverb into the per-round data guess_proverb plays from.
+# Kept apart from guess_proverb so proverb_binary can build records too
+# without the two modules importing each other.
+
+
+def build_word_indicies(proverb):
+    lower_proverb = proverb.lower()
+    indicies = collections.defaultdict(list)
+
+    current_word = ""
+    start_index = None
+    for i, c in enumerate(lower_proverb + " "):
+        if c.isalpha() or c == "'":
+            if start_index is None:
+                start_index = i
+            current_word += c.lower()
+        else:
+            indicies[current_word].append(start_index)
+            start_index = None
+            current_word = ""
+
+    return dict(indicies)
+
+
+# Everything a round needs that depends only on the proverb text
+ProverbRecord = collections.namedtuple(
+    "ProverbRecord", ["proverb", "indicies", "word_spans", "word_count", "mask",
+                      "letters", "masked_view"])
+
+
+def make_record(proverb, indicies):
+    mask = tuple(c.isalpha() for c in proverb)
+    word_spans = tuple(sorted((start, len(word)) for word, starts in indicies.items()
+                              if word for start in starts))
+    # Words split the same way get_raw_lower_words splits them, so the
+    # guess budget is simply the number of spans
+    word_count = len(word_spans)
+    # Masked positions of each lowercase letter, in order
+    letters = collections.defaultdict(list)
+    for i, c in enumerate(proverb):
+        if mask[i]:
+            letters[c.lower()].append(i)
+    letters = {c: tuple(positions) for c, positions in letters.items()}
+    masked_view = "".join("~" if is_masked else c for c, is_masked in zip(proverb, mask))
+    return ProverbRecord(proverb, indicies, word_spans, word_count, mask,
+                         letters, masked_view)
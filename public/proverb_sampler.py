@@ -0,0 +1,148 @@
+import random
+from array import array
+
+# Ways of picking the next proverb, all working on indexes so the corpus
+# (ProverbCorpus, BinaryCorpus or a list) is never copied:
+#   DedupedCorpus    the corpus minus repeated lines: a ProverbCorpus's
+#                    stored distinct positions, else found by hashing
+#   ShuffledSampler  every proverb once per pass, in random order
+#   AliasSampler     proverbs drawn with given weights, e.g. by difficulty
+# Per-entry state lives in flat arrays (a few bytes per proverb), which
+# keeps corpora of tens of millions of lines within memory.
+
+
+def _table_size(count):
+    # Power of two, at most three quarters full
+    size = 8
+    while size * 3 < count * 4:
+        size <<= 1
+    return size
+
+
+class DedupedCorpus:
+    """Sequence over the first occurrence of each distinct line. A
+    ProverbCorpus found those when its index was built (its distinct
+    array); for other sources, lines go into an open-addressing hash table
+    held in two uint32 arrays (the top half of each line's hash and its
+    index + 1) and a hash match is checked against the text, so only true
+    duplicates are dropped."""
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        distinct = getattr(corpus, "distinct", None)
+        if distinct is not None:
+            self.indexes = distinct
+        else:
+            self.indexes = self._find_distinct(corpus)
+        self.duplicates = len(corpus) - len(self.indexes)
+        # Keep BinaryCorpus's stored words when there are some
+        base_record = getattr(corpus, "record", None)
+        if base_record is not None:
+            self.record = lambda i: base_record(self.indexes[i])
+
+    @staticmethod
+    def _find_distinct(corpus):
+        size = _table_size(len(corpus))
+        mask = size - 1
+        tags = array("I", [0]) * size
+        slots = array("I", [0]) * size  # corpus index + 1, 0 = empty
+        indexes = array("I")
+        for i in range(len(corpus)):
+            line = corpus[i]
+            h = hash(line)
+            tag = (h >> 32) & 0xFFFFFFFF
+            slot = h & mask
+            while slots[slot]:
+                if tags[slot] == tag and corpus[slots[slot] - 1] == line:
+                    break
+                slot = (slot + 1) & mask
+            else:
+                tags[slot] = tag
+                slots[slot] = i + 1
+                indexes.append(i)
+        return indexes
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, i):
+        return self.corpus[self.indexes[i]]
+
+    def random_proverb(self, rng=random):
+        return self[rng.randrange(len(self))]
+
+    def close(self):
+        self.corpus.close()
+
+
+class ShuffledSampler:
+    """Draws 0..n-1 without replacement, starting a new pass once all have
+    been drawn. A Fisher-Yates shuffle advanced one step per draw, with the
+    swapped positions kept in a dict: memory grows with the draws made in
+    the current pass, never with n."""
+
+    def __init__(self, n, rng=None):
+        if n <= 0:
+            raise ValueError("Nothing to sample from.")
+        self.n = n
+        self.rng = rng or random.Random()
+        self.drawn = 0
+        self.swaps = {}
+
+    def sample(self):
+        if self.drawn == self.n:
+            self.drawn = 0
+            self.swaps = {}
+        k = self.drawn
+        j = self.rng.randrange(k, self.n)
+        swaps = self.swaps
+        picked = swaps.get(j, j)
+        if j != k:
+            swaps[j] = swaps.pop(k, k)
+        else:
+            swaps.pop(k, None)
+        self.drawn += 1
+        return picked
+
+    def remaining(self):
+        return self.n - self.drawn
+
+
+class AliasSampler:
+    """Weighted draws with Vose's alias method: an O(n) build into two
+    arrays, then each draw is one random index and one coin flip."""
+
+    def __init__(self, weights, rng=None):
+        weights = array("d", weights)
+        n = len(weights)
+        total = sum(weights)
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive sum.")
+        self.rng = rng or random.Random()
+        self.n = n
+        # Scale so the average weight is 1, in place
+        scale = n / total
+        for i in range(n):
+            weights[i] *= scale
+        self.prob = weights
+        self.alias = array("I", [0]) * n
+        small = array("I", (i for i in range(n) if weights[i] < 1.0))
+        large = array("I", (i for i in range(n) if weights[i] >= 1.0))
+        while small and large:
+            less = small.pop()
+            more = large[-1]
+            self.alias[less] = more
+            weights[more] -= 1.0 - weights[less]
+            if weights[more] < 1.0:
+                large.pop()
+                small.append(more)
+        # Whatever is left is 1 up to rounding
+        for leftovers in (small, large):
+            for i in leftovers:
+                weights[i] = 1.0
+                self.alias[i] = i
+
+    def sample(self):
+        i = self.rng.randrange(self.n)
+        return i if self.rng.random() < self.prob[i] else self.alias[i]
+
@@ -0,0 +1,156 @@
+import asyncio
+import random
+import sys
+from guess_proverb import ProverbSession, load_corpus
+
+# Multi-player proverb game over a line protocol. Every connection gets its
+# own ProverbSession; all sessions share one read-only corpus (from
+# guess_proverb.load_corpus), so it is mapped once however many players
+# are connected.
+#
+# Client -> server, one command per line:
+#   NEW               start a round
+#   GUESS <words>     guess one or more words (GUESS alone is the empty guess)
+#   STATS             session counters
+#   QUIT              close the connection
+# Server -> client, one reply line per command:
+#   ROUND <wrong> <max> <masked proverb>
+#   WON <wrong> <max> <proverb> / LOST <wrong> <max> <proverb>
+#   STATS <played> <won> <reveals> <words>
+#   BYE / ERR <message>
+# A bad command or an over-long line gets ERR and the connection stays open.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def round_reply(session):
+    if not session.finished:
+        return f"ROUND {session.wrong_guess} {session.max_guess} {session.view()}"
+    outcome = "WON" if session.won() else "LOST"
+    return f"{outcome} {session.wrong_guess} {session.max_guess} {session.record.proverb}"
+
+
+def handle_line(session, line):
+    """Applies one command to a session and returns the reply line, or
+    None when the client asked to quit."""
+    command, _, argument = line.strip().partition(" ")
+    command = command.upper()
+    if command == "NEW":
+        session.new_round()
+        return round_reply(session)
+    if command == "GUESS":
+        if session.finished:
+            return "ERR no round in progress"
+        session.guess(argument.strip())
+        return round_reply(session)
+    if command == "STATS":
+        return (f"STATS {session.rounds_played} {session.rounds_won} "
+                f"{session.total_reveal} {session.total_words}")
+    if command == "QUIT":
+        return None
+    return "ERR unknown command"
+
+
+class ProverbServer:
+    def __init__(self, corpus, seed=None):
+        if not len(corpus):
+            raise ValueError("No proverbs to serve.")
+        self.corpus = corpus
+        self.rng = random.Random(seed)
+        self.sessions = 0
+        self.server = None
+
+    async def handle(self, reader, writer):
+        session = ProverbSession(self.corpus, random.Random(self.rng.random()))
+        self.sessions += 1
+        try:
+            while True:
+                try:
+                    raw = await reader.readline()
+                except ValueError:
+                    # Longer than the stream limit; the reader dropped it
+                    reply = "ERR line too long"
+                else:
+                    if not raw:
+                        break
+                    try:
+                        reply = handle_line(session, raw.decode("utf-8", "replace"))
+                    except ValueError as error:
+                        reply = f"ERR {error}"
+                writer.write(((reply or "BYE") + "\n").encode("utf-8"))
+                await writer.drain()
+                if reply is None:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+class ProverbClient:
+    """Minimal async client, used by proverb_loadtest and handy for
+    scripting a game against a running server."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def send(self, line):
+        self.writer.write((line + "\n").encode("utf-8"))
+        await self.writer.drain()
+        reply = await self.reader.readline()
+        if not reply:
+            raise ConnectionError("Server closed the connection")
+        return reply.decode("utf-8").rstrip("\n")
+
+    async def new_round(self):
+        return await self.send("NEW")
+
+    async def guess(self, words):
+        return await self.send("GUESS " + words)
+
+    async def stats(self):
+        return await self.send("STATS")
+
+    async def close(self):
+        try:
+            await self.send("QUIT")
+        except ConnectionError:
+            pass
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def serve(path, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    corpus = load_corpus(path)  # prints why when it returns None
+    if corpus is None:
+        return
+    server = ProverbServer(corpus)
+    port = await server.start(host, port)
+    print(f"Serving {len(corpus)} proverbs on {host}:{port}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        corpus.close()
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "proverbs.txt"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    try:
+        asyncio.run(serve(path, port=port))
+    except KeyboardInterrupt:
+        pass
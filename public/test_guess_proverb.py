@@ -0,0 +1,52 @@
+import contextlib
+import io
+import random
+from guess_proverb import (MaskState, ProverbSession, build_word_indicies, compile_proverb,
+                           get_raw_lower_words, guess_input, reveal_char)
+
+PROVERBS = [
+    "Haste makes waste",
+    "A stitch in time saves nine",
+    "Don't count your chickens before they hatch",
+    "The early bird catches the worm",
+    "Actions speak louder than words.",
+    "Rome wasn't built in a day; all's well that ends well!",
+    "Too many cooks spoil the broth",
+    "Ab ba ab-ba 'tis",
+]
+WORDS = ["the", "a", "is", "in", "time", "well", "ab", "ba", "worm", "don't",
+         "nine", "zzz", "rome", "cooks", "'tis", "x"]
+
+
+def test_mask_state_reveals_like_reveal_char():
+    for proverb in PROVERBS:
+        masked = [c.isalpha() for c in proverb]
+        state = MaskState(compile_proverb(proverb))
+        while any(masked):
+            reveal_char(proverb, masked)
+            state.reveal_char()
+            assert [state[i] for i in range(len(state))] == masked, proverb
+        assert state.remaining == 0
+
+
+def test_session_plays_like_guess_input():
+    rng = random.Random(3)
+    for proverb in PROVERBS * 25:
+        masked = [c.isalpha() for c in proverb]
+        indicies = build_word_indicies(proverb)
+        max_guess = len(get_raw_lower_words(proverb, masked))
+        wrong_guess = 0
+        session = ProverbSession(())
+        session.new_round(proverb)
+        assert session.max_guess == max_guess
+        while wrong_guess < max_guess and any(masked):
+            user_input = " ".join(rng.sample(WORDS, rng.randrange(3)))
+            with contextlib.redirect_stdout(io.StringIO()):
+                wrong_guess += guess_input(proverb, masked, indicies,
+                                           max_guess - wrong_guess + 1, user_input, [])
+            result = session.guess(user_input)
+            assert session.view() == "".join("~" if m else c for c, m in zip(proverb, masked))
+            assert session.wrong_guess == wrong_guess
+            assert result.round_over == (wrong_guess >= max_guess or not any(masked))
+        assert session.finished
+        assert session.won() == (wrong_guess < max_guess)
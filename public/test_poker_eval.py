@@ -0,0 +1,86 @@
+import random
+from itertools import combinations
+from poker_eval import (CARD_INDEX, FLUSH, FULL_HOUSE, STRAIGHT, STRAIGHT_FLUSH,
+                        HandValue, evaluate, hand_value)
+
+
+def reference_five(cards):
+    """Textbook five-card ranking: (category, ranks in comparison order)."""
+    ranks = sorted((c >> 2 for c in cards), reverse=True)
+    counts = {r: ranks.count(r) for r in ranks}
+    by_count = sorted(counts, key=lambda r: (counts[r], r), reverse=True)
+    flush = len({c & 3 for c in cards}) == 1
+    distinct = sorted(set(ranks), reverse=True)
+    straight = None
+    if len(distinct) == 5:
+        if distinct[0] - distinct[4] == 4:
+            straight = distinct[0]
+        elif distinct == [12, 3, 2, 1, 0]:
+            straight = 3  # wheel, topped by the five
+    shape = sorted(counts.values(), reverse=True)
+    if straight is not None and flush:
+        return 8, [straight]
+    if shape == [4, 1]:
+        return 7, by_count
+    if shape == [3, 2]:
+        return 6, by_count
+    if flush:
+        return 5, ranks
+    if straight is not None:
+        return 4, [straight]
+    if shape == [3, 1, 1]:
+        return 3, by_count
+    if shape == [2, 2, 1]:
+        return 2, by_count
+    if shape == [2, 1, 1, 1]:
+        return 1, by_count
+    return 0, ranks
+
+
+def reference_best(cards):
+    return max(reference_five(five) for five in combinations(cards, 5))
+
+
+def as_reference(strength):
+    value = HandValue(strength)
+    return value.category, ["23456789TJQKA".index(r) for r in value.ranks]
+
+
+def cards(names):
+    return [CARD_INDEX[name] for name in names.split()]
+
+
+def test_matches_brute_force_best_of_five():
+    rng = random.Random(7)
+    for _ in range(3000):
+        hand = rng.sample(range(52), rng.choice((5, 6, 7)))
+        assert as_reference(evaluate(hand)) == reference_best(hand), hand
+
+
+def test_order_matches_brute_force():
+    rng = random.Random(11)
+    for _ in range(2000):
+        a, b = rng.sample(range(52), 7), rng.sample(range(52), 7)
+        assert (evaluate(a) < evaluate(b)) == (reference_best(a) < reference_best(b))
+        assert (evaluate(a) == evaluate(b)) == (reference_best(a) == reference_best(b))
+
+
+def test_two_trips_make_a_full_house():
+    value = hand_value(cards("KH KD KC 7H 7D 7C 2S"))
+    assert value.category == FULL_HOUSE
+    assert value.ranks == ["K", "7"]
+
+
+def test_six_and_seven_suited_cards_are_a_flush():
+    assert hand_value(cards("2H 5H 7H 9H JH KH 3D")).category == FLUSH
+    value = hand_value(cards("2H 4H 5H 7H 9H JH KH"))
+    assert value.category == FLUSH
+    assert value.ranks == ["K", "J", "9", "7", "5"]
+
+
+def test_wheel_is_a_five_high_straight():
+    value = hand_value(cards("AH 2D 3C 4S 5H 9D KC"))
+    assert value.category == STRAIGHT
+    assert value.ranks == ["5"]
+    assert value < hand_value(cards("2H 3D 4C 5S 6H 9D KC"))
+    assert hand_value(cards("AH 2H 3H 4H 5H 9D KC")).category == STRAIGHT_FLUSH